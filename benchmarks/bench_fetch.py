@@ -0,0 +1,98 @@
+"""
+Load test: fetch throughput and tail latency of DataLoader against the fake TradingView client
+
+Every configuration (a symbol) is fetched once by DataLoader.load_many (or AsyncDataLoader.aload_many with --async)
+from a FakeTvClient with the given latency, jitter, failure rate, empty response rate and rate limit. The latency of
+every load (including retries and backoff) is measured with the loader's profiler, and the throughput, latency
+percentiles, attempts and client counters are printed and optionally written as JSON (--output).
+
+Usage:
+python -m benchmarks.bench_fetch --symbols 200 --workers 16 --latency 0.02 --jitter 0.01 --failure-rate 0.05
+python -m benchmarks.bench_fetch --symbols 500 --async --rate 100 --burst 20 --output fetch.json
+"""
+from dataclasses import asdict
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from pricedata.io.async_loader import AsyncDataLoader
+from pricedata.io.fake_client import FakeTvClient
+from pricedata.io.loader import DataLoader, DataConfig, ClientConfig
+from pricedata.utils.profiling import Profiler, ProfileEvent
+
+
+def run(args: argparse.Namespace, base_dir: Path) -> dict:
+    """
+    Fetch every configuration once and summarize the measurements.
+    """
+    events: list[ProfileEvent] = []
+    client = FakeTvClient(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                          empty_rate=args.empty_rate, rate=args.rate, burst=args.burst, seed=args.seed)
+    loader = DataLoader(client=client, frame_cache=None, profiler=Profiler(events.append),
+                        fetch_attempts=args.attempts, fetch_delay=args.fetch_delay)
+    configs = [DataConfig(f"FAKE:SYM{i}", args.interval, args.bars, base_dir, storage_format=args.format)
+               for i in range(args.symbols)]
+
+    start = time.perf_counter()
+    if args.use_async:
+        results = asyncio.run(AsyncDataLoader(loader, max_concurrency=args.workers).aload_many(configs, ClientConfig()))
+    else:
+        results = loader.load_many(configs, ClientConfig(), max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    loads = [e.duration for e in events if e.name == "load_or_fetch"]
+    attempts = [e for e in events if e.name == "fetch attempt"]
+    ok = sum(r.ok for r in results.values())
+    latency = np.array(loads) if loads else np.array([np.nan])
+    return {
+        "symbols": args.symbols,
+        "loaded": ok,
+        "errors": len(results) - ok,
+        "seconds": elapsed,
+        "loads_per_second": len(results) / elapsed,
+        "bars_per_second": ok * args.bars / elapsed,
+        "latency_ms": {f"p{q}": float(np.percentile(latency, q) * 1e3) for q in (50, 90, 95, 99)} |
+                      {"max": float(latency.max() * 1e3)},
+        "attempts": len(attempts),
+        "failed_attempts": sum("error" in e.args for e in attempts),
+        "client": asdict(client.stats()),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100, help="number of configurations to load")
+    parser.add_argument("--bars", type=int, default=5000, help="bars per configuration")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--format", default="npz", help="cache storage format")
+    parser.add_argument("--workers", type=int, default=8, help="threads (or concurrent tasks with --async)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use AsyncDataLoader")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="mean of the exponential jitter in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--empty-rate", type=float, default=0.01)
+    parser.add_argument("--rate", type=float, default=None, help="client rate limit in requests per second")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--attempts", type=int, default=4, help="fetch attempts of the loader")
+    parser.add_argument("--fetch-delay", type=float, default=0.01, help="initial backoff of the loader in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the summary to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = run(args, Path(tmp))
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps({"arguments": vars(args) | {"output": str(args.output)},
+                                           "summary": summary}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
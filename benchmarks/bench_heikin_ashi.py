@@ -0,0 +1,90 @@
+"""
+Benchmark: Heikin-Ashi candles
+
+Compares:
+-> the previous pandas implementation of to_heikin_ashi (several full-frame temporaries and a deep copy)
+-> the current to_heikin_ashi (recursive kernel, transforms.kernels.heikin_ashi)
+-> the kernel alone, on contiguous float64 arrays
+-> a plain numpy add of two columns (reference of a single memory-bound pass)
+
+Usage:
+python -m benchmarks.bench_heikin_ashi --rows 1000000 10000000 100000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricedata.transforms.candles import to_heikin_ashi
+from pricedata.transforms.kernels import heikin_ashi, njit
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum
+
+
+def legacy_to_heikin_ashi(df: pd.DataFrame, append: bool) -> pd.DataFrame:
+    """
+    The previous implementation (open_ha seeded from open, not recursive), kept for comparison.
+    """
+    data_copy = df.copy()
+    data_copy[ColumnTypeEnum.CLOSE_HA] = data_copy[ColumnTypeSetEnum.OHLC.value].sum(axis=1) / 4.0
+    data_copy[ColumnTypeEnum.OPEN_HA] = data_copy[ColumnTypeEnum.OPEN]
+    data_copy.loc[data_copy.index[1:], ColumnTypeEnum.OPEN_HA] = (
+        data_copy[ColumnTypeSetEnum.OC_HA.value].sum(axis=1).shift(1) / 2.0).iloc[1:]
+    data_copy[ColumnTypeEnum.HIGH_HA] = data_copy[[ColumnTypeEnum.HIGH, *ColumnTypeSetEnum.OC_HA.value]].max(axis=1)
+    data_copy[ColumnTypeEnum.LOW_HA] = data_copy[[ColumnTypeEnum.LOW, *ColumnTypeSetEnum.OC_HA.value]].min(axis=1)
+    if not append:
+        data_copy[ColumnTypeSetEnum.OHLC.value] = data_copy[ColumnTypeSetEnum.OHLC_HA.value]
+    return data_copy
+
+
+def make_frame(n_rows: int) -> pd.DataFrame:
+    """
+    Create random-walk OHLC bars.
+    """
+    rng = np.random.default_rng(0)
+    close = 1000.0 + rng.standard_normal(n_rows).cumsum()
+    open_ = close + rng.standard_normal(n_rows)
+    return pd.DataFrame(
+        {"open": open_, "high": np.maximum(open_, close) + 1.0, "low": np.minimum(open_, close) - 1.0, "close": close},
+        index=pd.date_range("2000-01-01", periods=n_rows, freq="min", tz="UTC"),
+    )
+
+
+def timeit(func, repeat: int) -> float:
+    """
+    Return the best time of repeat calls, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"kernel backend: {'numba' if njit is not None else 'numpy scan'}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        arrays = [np.ascontiguousarray(df[col].to_numpy()) for col in ColumnTypeSetEnum.OHLC.value]
+        heikin_ashi(*(a[:10] for a in arrays))  # compile (numba) before timing
+
+        results = {
+            "legacy to_heikin_ashi": timeit(lambda: legacy_to_heikin_ashi(df, True), args.repeat),
+            "to_heikin_ashi": timeit(lambda: to_heikin_ashi(df, True), args.repeat),
+            "kernel": timeit(lambda: heikin_ashi(*arrays), args.repeat),
+            "numpy add": timeit(lambda: np.add(arrays[0], arrays[3]), args.repeat),
+        }
+
+        print(f"{n_rows:,} bars (best of {args.repeat}):")
+        for name, seconds in results.items():
+            print(f"  {name:<24} {seconds * 1e3:10.2f} ms  ({seconds / results['numpy add']:6.1f}x numpy add)")
+
+
+if __name__ == "__main__":
+    main()
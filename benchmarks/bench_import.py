@@ -0,0 +1,86 @@
+"""
+Benchmark: import time of the package, checked against time budgets
+
+Every statement is run in fresh interpreters (best of --repeat runs), timing only the statement itself (not the
+interpreter start). Besides the time budget, modules which must stay unimported are checked: the package and
+pricedata.core do not import pandas, and Data does not import tvDatafeed (only needed to fetch) nor numba (only
+needed for recursive kernels). A statement over its budget (times --tolerance) or importing a forbidden module is
+reported and the exit code is 1.
+
+Usage:
+python -m benchmarks.bench_import
+python -m benchmarks.bench_import --repeat 10 --tolerance 1.5
+"""
+from dataclasses import dataclass
+import argparse
+import json
+import subprocess
+import sys
+
+
+@dataclass(slots=True)
+class ImportCheck:
+    """
+    A statement with its time budget (in seconds) and modules it must not import.
+    """
+    statement: str
+    budget: float
+    forbidden: tuple[str, ...] = ()
+
+
+CHECKS = [
+    ImportCheck("import pricedata", 0.01, ("pandas", "numpy", "tvDatafeed", "numba")),
+    ImportCheck("import pricedata.core", 0.01, ("pandas", "numpy", "tvDatafeed", "numba")),
+    ImportCheck("import pricedata.utils", 0.05, ("pandas", "numpy")),
+    ImportCheck("from pricedata.core import Data", 1.5, ("tvDatafeed", "numba")),
+    ImportCheck("from pricedata.io.loader import DataLoader", 1.5, ("tvDatafeed", "numba")),
+]
+
+# run in a fresh interpreter: time of the statement and the checked modules which got imported
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "imported": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(check: ImportCheck, repeat: int) -> tuple[float, list[str]]:
+    """
+    Get the best time of a statement and the forbidden modules it imported.
+    """
+    best = float("inf")
+    imported: list[str] = []
+    for _ in range(repeat):
+        probe = PROBE.format(statement=check.statement, forbidden=check.forbidden)
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        imported = result["imported"]
+    return best, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="multiplier of every budget")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'statement':<46} {'time':>10} {'budget':>10}")
+    for check in CHECKS:
+        seconds, imported = measure(check, args.repeat)
+        budget = check.budget * args.tolerance
+        print(f"{check.statement:<46} {seconds * 1e3:>8.1f}ms {budget * 1e3:>8.1f}ms")
+        if seconds > budget:
+            failures.append(f"{check.statement}: {seconds * 1e3:.1f} ms over the budget of {budget * 1e3:.1f} ms")
+        if imported:
+            failures.append(f"{check.statement}: imports {', '.join(imported)}")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Benchmark: DataLoader._normalize_df
+
+Compares the cost of normalizing:
+-> raw data (naive index, uppercase columns, duplicates, unsorted) with a copy (the only path before the fast path)
+-> the same raw data in place
+-> already normalized data, e.g. read from own cache (fast path, no copy)
+
+Usage:
+python -m benchmarks.bench_normalize --rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricedata.io.loader import DataLoader
+
+
+def make_frames(n_rows: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Create raw and normalized frames with n_rows bars.
+    """
+    rng = np.random.default_rng(0)
+    close = 100.0 + rng.standard_normal(n_rows).cumsum()
+    index = pd.date_range("2000-01-01", periods=n_rows, freq="min")
+    raw = pd.DataFrame(
+        {"Open": close, "High": close + 1.0, "Low": close - 1.0, "Close": close, "Volume": rng.random(n_rows)},
+        index=index,
+    )
+    # a few duplicated and unordered bars, as in data coming from TradingView
+    raw = pd.concat([raw.iloc[-10:], raw])
+    normalized = DataLoader._normalize_df(raw)
+    return raw, normalized
+
+
+def timeit(func, repeat: int) -> float:
+    """
+    Return the best time of repeat calls, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw, normalized = make_frames(args.rows)
+    results = {
+        "raw (copy)": timeit(lambda: DataLoader._normalize_df(raw), args.repeat),
+        "raw (inplace)": timeit(lambda: DataLoader._normalize_df(raw.copy(deep=False), inplace=True), args.repeat),
+        "normalized (fast path)": timeit(lambda: DataLoader._normalize_df(normalized), args.repeat),
+    }
+
+    print(f"_normalize_df on {args.rows:,} rows (best of {args.repeat}):")
+    for name, seconds in results.items():
+        print(f"  {name:<24} {seconds * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Benchmark: every stage of the Data pipeline on synthetic OHLCV bars
+
+Stages:
+-> normalize: DataLoader._normalize_df of raw bars (naive index, duplicates, unsorted)
+-> save[format], load_or_fetch[format]: writing and reading a cache file of every storage format
+-> with_candles: heikin ashi candles
+-> with_features[kind]: every feature kind (price averages, returns, rolling indicators)
+-> feature_cache[miss], feature_cache[hit]: the four price averages through a FeatureCache, computed and written or
+   attached from the cache, compared with with_features[price averages] (computing them), and a write to one of
+   them (a hit must give writable columns, as a miss does)
+-> drop_columns
+-> pipeline: load, candles, features and drop in one chain
+
+Every stage is timed (best of --repeat runs) and then run once more with tracemalloc to measure its peak and
+retained memory. Results are written as JSON (--output) and compared with a stored baseline (--baseline): stages
+slower or using more memory than the tolerance allows are reported as regressions and the exit code is 1. A feature
+cache hit slower than computing the features is a regression as well. Recursive kernels are much faster with numba,
+so a baseline recorded with another kernel backend is not compared.
+
+Usage:
+python -m benchmarks.bench_pipeline --rows 1000 100000 1000000 --output results.json
+python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from pricedata.utils.synthetic import make_ohlcv
+from pricedata.core.dataset import Data
+from pricedata.io.feature_cache import FeatureCache
+from pricedata.io.frame_cache import FrameCache
+from pricedata.io.loader import DataLoader, DataConfig, ClientConfig
+from pricedata.transforms.kernels import njit
+from pricedata.utils.dev_types.spec.spec import OHLCSpec, ReturnSpec, IndicatorSpec, DropColumnsSpec
+
+FEATURES = {
+    "ohlc4": OHLCSpec(feature_kinds="ohlc4"),
+    "hlc3": OHLCSpec(feature_kinds="hlc3"),
+    "hlcc4": OHLCSpec(feature_kinds="hlcc4"),
+    "hl2": OHLCSpec(feature_kinds="hl2"),
+    "return": ReturnSpec(feature_kinds="return"),
+    "log-return": ReturnSpec(feature_kinds="log-return"),
+    "returns x3 horizons": ReturnSpec(feature_kinds=["return", "log-return"], horizons=[1, 5, 20]),
+    "sma": IndicatorSpec(feature_kinds="sma", windows=[20]),
+    "ema": IndicatorSpec(feature_kinds="ema", windows=[20]),
+    "atr": IndicatorSpec(feature_kinds="atr", windows=[14]),
+    "rsi": IndicatorSpec(feature_kinds="rsi", windows=[14]),
+    "std": IndicatorSpec(feature_kinds="std", windows=[20]),
+    "volatility": IndicatorSpec(feature_kinds="volatility", windows=[20]),
+    "zscore": IndicatorSpec(feature_kinds="zscore", windows=[20]),
+    "price averages": OHLCSpec(feature_kinds=["ohlc4", "hlc3", "hlcc4", "hl2"]),
+}
+
+STORAGE_FORMATS = ["csv", "parquet", "feather", "npz", "memmap"]
+
+
+@dataclass(slots=True)
+class StageResult:
+    """
+    Time and memory of a single stage.
+    """
+    stage: str
+    rows: int
+    seconds: float
+    rows_per_second: float
+    peak_bytes: int
+    allocated_bytes: int
+
+
+def measure(name: str, n_rows: int, setup, run, repeat: int) -> StageResult:
+    """
+    Time a stage (best of repeat runs) and measure its memory in one more run.
+
+    Args:
+        name (str): stage name
+        n_rows (int): number of bars
+        setup (Callable[[], object]): prepares the input of a run (not measured)
+        run (Callable[[object], object]): the stage
+        repeat (int): number of timed runs
+
+    Return:
+        StageResult: the measurements
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - start)
+
+    arg = setup()
+    tracemalloc.start()
+    result = run(arg)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return StageResult(name, n_rows, best, n_rows / best if best > 0 else float("inf"), peak, allocated)
+
+
+def run_stages(n_rows: int, base_dir: Path, *, repeat: int, formats: list[str], gaps: float,
+               duplicates: float) -> list[StageResult]:
+    """
+    Measure every stage on n_rows synthetic bars.
+    """
+    raw = make_ohlcv(n_rows, gaps=gaps, duplicates=duplicates, raw=True)
+    bars = make_ohlcv(n_rows, gaps=gaps)
+    client_cfg = ClientConfig()
+    configs = {fmt: DataConfig("SYNTH:TEST", "1m", len(bars), base_dir, storage_format=fmt) for fmt in formats}
+    # loads of Data are served from the frame cache, so transform stages start from the same frame in memory
+    loader = DataLoader(frame_cache=FrameCache(max_bytes=4 * bars.memory_usage(deep=True).sum()))
+    data_cfg = configs[formats[-1]]
+
+    def loaded() -> Data:
+        return Data(data_cfg, client_cfg, loader).load()
+
+    results = [measure("normalize", n_rows, lambda: raw, DataLoader._normalize_df, repeat)]
+    for fmt, cfg in configs.items():
+        results.append(measure(f"save[{fmt}]", n_rows, lambda: bars, lambda df, c=cfg: loader.save(df, c), repeat))
+        uncached = DataLoader(frame_cache=None)
+        results.append(measure(f"load_or_fetch[{fmt}]", n_rows, lambda: cfg,
+                               lambda c, u=uncached: u.load_or_fetch(c, client_cfg), repeat))
+    loaded().df  # fill the frame cache
+
+    results.append(measure("with_candles", n_rows, loaded,
+                           lambda d: d.with_candles(kind="ha", append=True).df, repeat))
+    for name, spec in FEATURES.items():
+        results.append(measure(f"with_features[{name}]", n_rows, loaded,
+                               lambda d, s=spec: d.with_features(s).df, repeat))
+    feature_cache = FeatureCache(base_dir / "features")
+
+    def cached(clear: bool) -> Data:
+        if clear:
+            feature_cache.clear()
+        return Data(data_cfg, client_cfg, loader, feature_cache=feature_cache).load()
+
+    def write_averages(d: Data) -> pd.DataFrame:
+        df = d.with_features(FEATURES["price averages"]).df
+        df.iloc[0, df.columns.get_loc("ohlc4")] = 0.0
+        return df
+
+    for name, clear in (("miss", True), ("hit", False)):
+        results.append(measure(f"feature_cache[{name}]", n_rows, lambda c=clear: cached(c), write_averages, repeat))
+    results.append(measure("drop_columns", n_rows, lambda: loaded().with_features(FEATURES["ohlc4"]),
+                           lambda d: d.drop_columns(DropColumnsSpec(cols=["ohlc4"])).df, repeat))
+    results.append(measure("pipeline", n_rows, lambda: Data(data_cfg, client_cfg, loader), lambda d: (
+        d.load()
+        .with_candles(kind="ha", append=True)
+        .with_features(OHLCSpec(feature_kinds=["ohlc4", "hl2"], candle_kinds=["standard", "ha"]))
+        .with_features(FEATURES["returns x3 horizons"])
+        .with_features(IndicatorSpec(feature_kinds=["sma", "ema", "rsi"], windows=[14, 50]))
+        .drop_columns(DropColumnsSpec(cols=["open-ha", "high-ha", "low-ha", "close-ha"]))
+        .df
+    ), repeat))
+    return results
+
+
+def environment() -> dict:
+    """
+    Describe the machine and library versions.
+    """
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "kernel backend": "numba" if njit is not None else "numpy scan",
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], *, time_tolerance: float, memory_tolerance: float,
+            min_seconds: float = 5e-3, min_bytes: int = 1024 ** 2) -> list[str]:
+    """
+    Compare results with a baseline.
+
+    A stage regresses if it is slower (or has a higher peak memory) than the baseline by more than the tolerance
+    and by more than min_seconds (min_bytes), so the noise of tiny stages is ignored.
+
+    Args:
+        results (list[dict]): current stage results
+        baseline (list[dict]): baseline stage results
+        time_tolerance (float): allowed relative increase of time, e.g. 0.25
+        memory_tolerance (float): allowed relative increase of peak memory, e.g. 0.1
+        min_seconds (float): ignored absolute increase of time. Default is 5 ms.
+        min_bytes (int): ignored absolute increase of peak memory. Default is 1 MiB.
+
+    Return:
+        list[str]: descriptions of regressions
+    """
+    base = {(r["stage"], r["rows"]): r for r in baseline}
+    regressions = []
+    print(f"{'stage':<34} {'rows':>12} {'time':>10} {'vs base':>8} {'peak MiB':>10} {'vs base':>8}")
+    for r in results:
+        b = base.get((r["stage"], r["rows"]))
+        time_ratio = r["seconds"] / b["seconds"] if b and b["seconds"] else None
+        peak_ratio = r["peak_bytes"] / b["peak_bytes"] if b and b["peak_bytes"] else None
+        print(f"{r['stage']:<34} {r['rows']:>12,} {r['seconds'] * 1e3:>8.2f}ms {_ratio(time_ratio):>8} "
+              f"{r['peak_bytes'] / 1024 ** 2:>10.1f} {_ratio(peak_ratio):>8}")
+        if b is None:
+            continue
+        if r["seconds"] > b["seconds"] * (1 + time_tolerance) and r["seconds"] - b["seconds"] > min_seconds:
+            regressions.append(f"{r['stage']} ({r['rows']:,} rows): {time_ratio:.2f}x time")
+        if r["peak_bytes"] > b["peak_bytes"] * (1 + memory_tolerance) and r["peak_bytes"] - b["peak_bytes"] > min_bytes:
+            regressions.append(f"{r['stage']} ({r['rows']:,} rows): {peak_ratio:.2f}x peak memory")
+    return regressions
+
+
+def feature_cache_regressions(results: list[dict], *, min_seconds: float = 5e-3) -> list[str]:
+    """
+    Check that a feature cache hit is faster than computing the features.
+
+    Sizes where computing takes less than min_seconds are skipped (opening the cached files dominates there).
+
+    Args:
+        results (list[dict]): stage results
+        min_seconds (float): minimal time of computing the features. Default is 5 ms.
+
+    Return:
+        list[str]: descriptions of regressions
+    """
+    stages = {(r["stage"], r["rows"]): r["seconds"] for r in results}
+    regressions = []
+    for (stage, rows), seconds in stages.items():
+        computed = stages.get(("with_features[price averages]", rows))
+        if stage != "feature_cache[hit]" or computed is None or computed < min_seconds:
+            continue
+        print(f"feature cache hit ({rows:,} rows): {computed / seconds:.2f}x faster than computing")
+        if seconds >= computed:
+            regressions.append(f"{stage} ({rows:,} rows): slower than computing ({seconds / computed:.2f}x)")
+    return regressions
+
+
+def load_baseline(path: Path | None, backend: str) -> list[dict]:
+    """
+    Load baseline stage results recorded with the given kernel backend.
+
+    Args:
+        path (Path | None): JSON file written with --output. If None, there is no baseline.
+        backend (str): kernel backend of this run (see environment)
+
+    Return:
+        list[dict]: baseline stage results, empty if there is no baseline or it was recorded with another backend
+    """
+    if path is None:
+        return []
+    stored = json.loads(path.read_text())
+    recorded = stored["environment"].get("kernel backend")
+    if recorded != backend:
+        print(f"baseline {path} was recorded with the {recorded} kernel backend, this run uses {backend}: "
+              f"stages are not compared")
+        return []
+    return stored["results"]
+
+
+def _ratio(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}x"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--formats", nargs="+", default=STORAGE_FORMATS, choices=STORAGE_FORMATS)
+    parser.add_argument("--gaps", type=float, default=0.01, help="fraction of missing bars")
+    parser.add_argument("--duplicates", type=float, default=0.001, help="fraction of duplicated raw bars")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare with results stored in this JSON file")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            results.extend(run_stages(n_rows, Path(tmp), repeat=args.repeat, formats=args.formats, gaps=args.gaps,
+                                      duplicates=args.duplicates))
+    report = {
+        "environment": environment(),
+        "arguments": {"repeat": args.repeat, "gaps": args.gaps, "duplicates": args.duplicates},
+        "results": [asdict(r) for r in results],
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    baseline = load_baseline(args.baseline, report["environment"]["kernel backend"])
+    regressions = compare(report["results"], baseline, time_tolerance=args.time_tolerance,
+                          memory_tolerance=args.memory_tolerance)
+    regressions += feature_cache_regressions(report["results"])
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,21 @@
-from pricedata.core.dataset import Data
+import importlib
 
 SUPPORTED_CANDLES = {"standard", "heiken ashi"}
 
-Data.with_candles.__doc__ = Data.with_candles.__doc__.format(
-    supported_kinds=", ".join(SUPPORTED_CANDLES)
-)
+# Data and Panel (with pandas, numpy and the transforms) are imported on first access, see __getattr__
+_LAZY = {
+    "Data": "pricedata.core.dataset",
+    "Panel": "pricedata.core.panel",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
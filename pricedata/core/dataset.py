@@ -1,15 +1,44 @@
+from contextlib import nullcontext
+import json
+
+import numpy as np
+
+from pricedata.core import SUPPORTED_CANDLES
+from pricedata.core.plan import (
+    PlanStep, feature_steps, optimize, explain, since_last_load, column_order, signature, inputs, outputs
+)
+from pricedata.io.feature_cache import FeatureCache
 from pricedata.io.loader import DataLoader, DataConfig, ClientConfig
+from pricedata.io.storage import _utc_index
 from pricedata.transforms.candles import to_heikin_ashi
 from pricedata.transforms.features import *
-from pricedata.utils.dev_types.spec.spec import OHLCSpec, DropColumnsSpec, ReturnSpec
-from pricedata.utils.dev_types.dev_types import ColumnTypeEnum
+from pricedata.utils.dev_types.spec.spec import OHLCSpec, DropColumnsSpec, ReturnSpec, IndicatorSpec
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, DirectionEnum
+from pricedata.utils.memory import MemoryTracker, MemoryReport, attach_columns
+from pricedata.utils.profiling import Profiler, span
 
 
 class Data:
     """
     The main object to operate on the price data.
+
+    In lazy mode, load and transforms are only recorded in a plan. The plan is optimized (e.g. price averages of many
+    with_features calls are computed in one pass, columns dropped later are not computed at all) and executed on the
+    first access to df. Use explain() to see the plan.
+
+    Data owns the frame it loads: transforms add, rewrite and drop columns of it without copying the other columns,
+    and new columns take over the arrays computed for them. Frames shared with the frame cache of DataLoader are
+    kept apart by pandas copy-on-write; frames of memmap caches are mapped copy-on-write, so writes only copy the
+    touched pages and never reach the file. Use track_memory=True to see the memory allocated by every stage
+    (memory_report(), memory_report(stop=True) stops tracing when done).
+
+    With a profiler (given, or the one of the loader), every stage emits a timing event with the number of rows and
+    the size of the data after it: load, candles, every batched feature step or feature handler, drop, the
+    stages replayed by append_bars and the append (or concatenation) of the new bars.
     """
-    def __init__(self, data_cfg: DataConfig, client_cfg: ClientConfig, loader: DataLoader):
+    def __init__(self, data_cfg: DataConfig, client_cfg: ClientConfig, loader: DataLoader, *, lazy: bool = False,
+                 feature_cache: FeatureCache | None = None, track_memory: bool = False,
+                 profiler: Profiler | None = None):
         """
         Setting initialize parameters.
 
@@ -17,11 +46,39 @@ class Data:
             data_cfg (DataConfig): contextual parameters
             client_cfg (ClientConfig): client username and password
             loader (DataLoader): price data loader object
+            lazy (bool): if true, load and transforms are deferred until df is accessed. Default is false.
+            feature_cache (FeatureCache | None): persistent cache of price averages and returns. If given, features
+                        already computed for the same bars are read from it instead of being recomputed.
+                        Default is None.
+            track_memory (bool): if true, trace memory allocated by every stage with tracemalloc (for debugging, it
+                        slows allocations down). Default is false.
+            profiler (Profiler | None): receives timing events of every stage. Default is None (the profiler of
+                        the loader, if any).
         """
         self._data_cfg = data_cfg
         self._client_cfg = client_cfg
         self._loader = loader
+        self._lazy = lazy
+        self._feature_cache = feature_cache
+        self._memory = MemoryTracker() if track_memory else None
+        self._profiler = profiler if profiler is not None else loader.profiler
         self._df: pd.DataFrame | None = None
+        # identity of the loaded data (see DataLoader.cache_identity), None if unknown or changed by append_bars
+        self._source: str | None = None
+
+        # preallocated columns of _df, into which append_bars writes new bars
+        self._buffer: _FrameBuffer | None = None
+        # bars appended by append_bars which do not fit the buffer, concatenated with _df on the next access
+        self._pending: list[pd.DataFrame] = []
+        # steps recorded in lazy mode, not executed yet
+        self._plan: list[PlanStep] = []
+        # executed transforms with their carry states, replayed on appended bars
+        self._steps: list[tuple[PlanStep, dict]] = []
+        self._stateful_features = {
+            ColumnTypeEnum.RETURN, ColumnTypeEnum.LOG_RETURN, ColumnTypeEnum.SMA, ColumnTypeEnum.EMA,
+            ColumnTypeEnum.ATR, ColumnTypeEnum.RSI, ColumnTypeEnum.STD, ColumnTypeEnum.VOLATILITY,
+            ColumnTypeEnum.ZSCORE,
+        }
 
         self.feature_handler = {
             ColumnTypeEnum.OHLC4: add_ohlc4,
@@ -30,6 +87,13 @@ class Data:
             ColumnTypeEnum.HL2: add_hl2,
             ColumnTypeEnum.RETURN: add_return,
             ColumnTypeEnum.LOG_RETURN: add_log_return,
+            ColumnTypeEnum.SMA: add_sma,
+            ColumnTypeEnum.EMA: add_ema,
+            ColumnTypeEnum.ATR: add_atr,
+            ColumnTypeEnum.RSI: add_rsi,
+            ColumnTypeEnum.STD: add_std,
+            ColumnTypeEnum.VOLATILITY: add_volatility,
+            ColumnTypeEnum.ZSCORE: add_zscore,
         }
 
     def load(self) -> "Data":
@@ -41,7 +105,7 @@ class Data:
         Return:
             Self
         """
-        self._df = self._loader.load_or_fetch(self._data_cfg, self._client_cfg)
+        self._submit(PlanStep("load"))
         return self
 
     @property
@@ -52,9 +116,9 @@ class Data:
         Return:
             The price data
         """
-        if self._df is None:
-            raise RuntimeError("Call Data.load() first")
-        return self._df
+        if self._plan:
+            self._collect()
+        return self._frame()
 
     def with_candles(self, *, kind: str = "standard", append: bool = False) -> "Data":
         """
@@ -71,32 +135,398 @@ class Data:
             Data object.
         """
         if kind.lower() in ("heikin_ashi", "heiken ashi", "ha"):
-            self._df = to_heikin_ashi(self.df, append)
+            self._submit(PlanStep("candles", dict(append=append)))
         elif kind.lower() == "standard":
             pass
         else:
             raise ValueError(f"Unknown candle type: {kind}")
         return self
 
-    def with_features(self, spec: OHLCSpec | ReturnSpec = None) -> "Data":
+    def with_features(self, spec: OHLCSpec | ReturnSpec | IndicatorSpec = None) -> "Data":
         """
         Allows you to add columns such as:
-        OHLC4, HLC3, return, logarithmic return
+        OHLC4, HLC3, return, logarithmic return, SMA, EMA, ATR, RSI, rolling std, volatility, z-score
 
         
         """
-        for feature_kind in spec.feature_kinds:
-            handler_ = self.feature_handler[feature_kind]
-            if handler_:
-                handler_(self._df, spec=spec)
-
+        for step in feature_steps(spec):
+            self._submit(step)
         return self
 
     def with_states(self) -> "Data":
         return self
 
-    def drop_columns(self, spec: DropColumnsSpec):
-        self._df = self._df.drop(columns=spec.cols)
+    def drop_columns(self, spec: DropColumnsSpec) -> "Data":
+        self._submit(PlanStep("drop", dict(cols=list(spec.cols))))
+        return self
+
+    def explain(self) -> str:
+        """
+        Describe the plan: in lazy mode, the optimized steps to be executed, otherwise the executed steps.
+
+        Return:
+            str: one numbered line per step
+        """
+        if self._lazy:
+            return explain(optimize(self._plan))
+        return explain([step for step, _ in self._steps])
+
+    def memory_report(self, *, stop: bool = False) -> MemoryReport:
+        """
+        Get the memory accounting of executed stages (load, every transform, append or concatenation of new bars).
+
+        Args:
+            stop (bool): if true, stop tracing (if it was started by this object); later stages start it again.
+                Default is False.
+
+        Return:
+            MemoryReport: allocated and peak bytes of every stage, the peak and retained memory of the whole pipeline
+        """
+        if self._memory is None:
+            raise RuntimeError("Memory tracking is disabled, use Data(..., track_memory=True)")
+        if stop:
+            self._memory.stop()
+        return self._memory.report
+
+    def append_bars(self, new_df: pd.DataFrame) -> "Data":
+        """
+        Append new bars and compute candles and features only for them.
+
+        Every transform applied so far (with_candles, with_features, drop_columns) is replayed on the new bars,
+        continuing from its carry state (e.g. the last heikin ashi candle, the last source value of returns), so the
+        result is the same as for the whole history, at the cost of O(new bars). Bars not newer than the last one are
+        ignored. The first append copies the data into preallocated columns with spare rows (doubled when full), so
+        appending bars and reading df again costs amortized O(new bars); frames returned by df before are not
+        changed. Forward returns depend on later bars, so data with forward returns can not be appended to (load it
+        again instead).
+
+        Args:
+            new_df (pd.DataFrame): new OHLCV bars, in the same format as returned by DataLoader
+
+        Return:
+            Data object.
+        """
+        if self._plan:
+            self._collect()
+        if any(step.op == "returns" and _forward(step.args["targets"]) for step, _ in self._steps):
+            raise ValueError("Forward returns depend on later bars, load the data again instead of appending bars.")
+        last = self._pending[-1].index[-1] if self._pending else self._frame().index[-1]
+        new_df = DataLoader._normalize_df(new_df, index_name=self._data_cfg.index_name)
+        if self._data_cfg.compact:
+            new_df = DataLoader._compact_df(new_df)
+        new_df = new_df[new_df.index > last]
+        if new_df.empty:
+            return self
+        self._source = None
+
+        for step, state in self._steps:
+            if step.op in ("averages", "returns", "indicators", "features"):
+                new_df = new_df.copy(deep=False)
+            with span(self._profiler, step.op, "append") as event:
+                new_df = self._run_step(new_df, step, state)
+                if event is not None:
+                    event.record(new_df)
+
+        if not self._pending:
+            with self._track("append"), span(self._profiler, "append", "data") as event:
+                if self._buffer is None:
+                    self._buffer = _FrameBuffer.create(self._frame(), len(new_df))
+                if self._buffer is not None and self._buffer.append(new_df):
+                    self._df = self._buffer.frame()
+                    if event is not None:
+                        event.record(self._df)
+                    return self
+            # e.g. a new dtype or a changing text column: fall back to concatenation
+            self._buffer = None
+        self._pending.append(new_df)
+        return self
+
+    def _frame(self) -> pd.DataFrame:
+        """
+        Get the executed data, with appended bars.
+        """
+        if self._df is None:
+            raise RuntimeError("Call Data.load() first")
+        if self._pending:
+            with self._track("concat"), span(self._profiler, "concat", "data", parts=len(self._pending)) as event:
+                self._df = pd.concat([self._df, *self._pending])
+                self._pending = []
+                if event is not None:
+                    event.record(self._df)
+        return self._df
+
+    def _track(self, name: str):
+        """
+        Track memory of a stage (if enabled).
+        """
+        if self._memory is None:
+            return nullcontext()
+        return self._memory.stage(name, lambda: self._df)
+
+    def _submit(self, step: PlanStep) -> None:
+        """
+        Record a step in lazy mode, otherwise execute it.
+        """
+        if self._lazy:
+            self._plan.append(step)
+        else:
+            self._execute(step)
+
+    def _collect(self) -> None:
+        """
+        Optimize and execute the recorded plan.
+        """
+        plan, self._plan = self._plan, []
+        original = [step for step in since_last_load(plan) if step.op != "load"]
+        columns = None
+        for step in optimize(plan):
+            if step.op != "load" and columns is None:
+                columns = list(self._frame().columns)
+            self._execute(step)
+
+        # merged steps may create columns in a different order than the recorded ones. A step may also add fewer
+        # columns than predicted (e.g. heikin ashi candles without a dropped source column), so the predicted order
+        # is kept for the columns actually present and unpredicted columns follow
+        order = column_order(columns, original) if columns is not None else None
+        if order is not None:
+            present = list(self._df.columns)
+            order = [col for col in order if col in set(present)]
+            order.extend(col for col in present if col not in set(order))
+            if order != present:
+                self._df = self._df[order]
+                self._buffer = None
+
+    def _execute(self, step: PlanStep) -> None:
+        """
+        Execute a step on the data and remember it with its carry state.
+        """
+        if step.op == "load":
+            with self._track(step.op), span(self._profiler, step.op, "data", symbol=self._data_cfg.symbol) as event:
+                source = self._loader.cache_identity(self._data_cfg) if self._feature_cache is not None else None
+                self._df = self._loader.load_or_fetch(self._data_cfg, self._client_cfg)
+                # a cache file replaced during the load has another identity: the loaded data is not identified
+                if source is not None and source != self._loader.cache_identity(self._data_cfg):
+                    source = None
+                self._source = source
+                self._buffer = None
+                self._pending = []
+                self._steps = []
+                if event is not None:
+                    event.record(self._df)
+            return
+        state = {}
+        df = self._frame()
+        # the step changes the columns, the next append starts a new buffer
+        self._buffer = None
+        with self._track(step.op), span(self._profiler, step.op, "data") as event:
+            if self._feature_cache is not None and step.op in ("averages", "returns"):
+                self._df = self._run_cached_step(df, step, state)
+            else:
+                self._df = self._run_step(df, step, state)
+            if event is not None:
+                event.record(self._df)
+                if step.op != "features":
+                    event.args["columns"] = [str(col) for col in outputs(step)]
+        self._steps.append((step, state))
+
+    def _run_cached_step(self, df: pd.DataFrame, step: PlanStep, state: dict) -> pd.DataFrame:
+        """
+        Run a feature step through the feature cache.
+
+        Args:
+            df (pd.DataFrame): data to transform, feature columns are added in place
+            step (PlanStep): averages or returns step
+            state (dict): carry state of the step
+
+        Return:
+            Transformed data.
+        """
+        identity = None
+        if self._source is not None:
+            # the loaded data and every transform applied to it since
+            lineage = [[signature(done), str(done.args.get("spec"))] for done, _ in self._steps]
+            identity = json.dumps([self._source, lineage])
+        key = self._feature_cache.key(df, inputs(step), signature(step), identity)
+        cached = self._feature_cache.get(key, len(df))
+        if self._profiler is not None:
+            self._profiler.instant("feature cache miss" if cached is None else "feature cache hit", "data", op=step.op)
+        if cached is None:
+            df = self._run_step(df, step, state)
+            self._feature_cache.put(key, df[outputs(step)])
+            return df
+
+        # the cached columns (mapped copy-on-write, so writable like computed ones) are attached without copying
+        attach_columns(df, cached)
+        if step.op == "returns":
+            # the same carry state as add_return_columns leaves: the last values of the sources
+            return_state(df, [t for t in step.args["targets"] if t not in _forward(step.args["targets"])], state)
+        return df
+
+    def _run_step(self, df: pd.DataFrame, step: PlanStep, state: dict) -> pd.DataFrame:
+        """
+        Run a single transform step.
+
+        Args:
+            df (pd.DataFrame): data to transform, feature columns are added in place
+            step (PlanStep): the step
+            state (dict): carry state of the step
+
+        Return:
+            Transformed data.
+        """
+        if step.op == "candles":
+            return to_heikin_ashi(df, step.args["append"], state=state)
+        if step.op == "averages":
+            # every price average is computed in a single pass
+            add_price_average_columns(df, step.args["targets"])
+        elif step.op == "returns":
+            # every source and horizon of a kind is computed in one batched pass, forward returns without carry state
+            forward = _forward(step.args["targets"])
+            add_return_columns(df, [t for t in step.args["targets"] if t not in forward], state=state)
+            add_return_columns(df, forward)
+        elif step.op == "indicators":
+            # every window length of a source is computed in one batched pass
+            add_indicator_columns(df, step.args["targets"], state=state)
+        elif step.op == "features":
+            self._apply_features(df, step.args["spec"], state)
+        elif step.op == "drop":
+            optional = step.args.get("optional", ())
+            return df.drop(columns=[col for col in step.args["cols"] if col not in optional or col in df.columns])
+        return df
+
+    def _apply_features(self, df: pd.DataFrame, spec, state: dict) -> None:
+        """
+        Add columns of a given specification to df.
+
+        Args:
+            df (pd.DataFrame): data to which columns are added
+            spec: specification
+            state (dict): carry state of stateful features
+        """
+        for feature_kind in spec.feature_kinds:
+            handler_ = self.feature_handler[feature_kind]
+            with span(self._profiler, f"feature[{feature_kind}]", "data") as event:
+                if handler_ and feature_kind in self._stateful_features:
+                    handler_(df, spec=spec, state=state)
+                elif handler_:
+                    handler_(df, spec=spec)
+                if event is not None:
+                    event.record(df)
 
     def save(self) -> None:
         self._loader.save(self.df, self._data_cfg)
+
+
+class _FrameBuffer:
+    """
+    Columns of a frame preallocated with spare rows, so appended bars are written in place instead of concatenating
+    the whole history.
+
+    Numeric columns and the index are numpy arrays with a capacity doubled when full; columns of other dtypes (e.g.
+    the symbol) must hold a single value. Frames are built on views of the first n rows, so frames built before an
+    append are not changed by it.
+    """
+    def __init__(self, df: pd.DataFrame, capacity: int, constants: dict):
+        self._n = len(df)
+        self._columns = list(df.columns)
+        self._dtypes = df.dtypes.to_dict()
+        self._index_name = df.index.name
+        self._unit = df.index.unit
+        self._constants = constants
+        self._ticks = np.empty(0, dtype="int64")
+        self._arrays: dict = {}
+        self._extension: dict = {}
+        self._grow(capacity, df)
+
+    @classmethod
+    def create(cls, df: pd.DataFrame, n_new: int) -> "_FrameBuffer | None":
+        """
+        Copy data into a new buffer with room for at least n_new more bars.
+
+        Args:
+            df (pd.DataFrame): normalized data
+            n_new (int): number of bars to be appended
+
+        Return:
+            _FrameBuffer | None: the buffer, None if a column can not be buffered (a varying non-numeric column)
+        """
+        constants = {}
+        for col, dtype in df.dtypes.items():
+            if not _is_numeric(dtype):
+                values = df[col].unique()
+                if len(values) != 1:
+                    return None
+                constants[col] = values[0]
+        return cls(df, max(2 * (len(df) + n_new), 16), constants)
+
+    def append(self, new_df: pd.DataFrame) -> bool:
+        """
+        Write bars after the buffered ones.
+
+        Args:
+            new_df (pd.DataFrame): bars with the same columns and dtypes, all newer than the buffered ones
+
+        Return:
+            bool: false (and nothing is written) if new_df does not fit the buffer
+        """
+        if list(new_df.columns) != self._columns or new_df.dtypes.to_dict() != self._dtypes \
+                or new_df.index.unit != self._unit:
+            return False
+        for col, value in self._constants.items():
+            if (new_df[col] != value).any():
+                return False
+
+        end = self._n + len(new_df)
+        if end > len(self._ticks):
+            self._grow(2 * end)
+        self._ticks[self._n:end] = new_df.index.asi8
+        for col, values in self._arrays.items():
+            values[self._n:end] = new_df[col].to_numpy()
+        self._n = end
+        return True
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Get the buffered data, on views of the buffers (without copying).
+        """
+        index = _utc_index(self._ticks[:self._n], self._unit, self._index_name)
+        data = {
+            col: self._arrays[col][:self._n] if col in self._arrays else self._extension[col][:self._n]
+            for col in self._columns
+        }
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def _grow(self, capacity: int, df: pd.DataFrame | None = None) -> None:
+        """
+        Move the buffered rows (or the rows of df) into new buffers of a given capacity.
+        """
+        ticks = np.empty(capacity, dtype="int64")
+        ticks[:self._n] = df.index.asi8 if df is not None else self._ticks[:self._n]
+        self._ticks = ticks
+        for col in self._columns:
+            if col in self._constants:
+                self._extension[col] = pd.Series(self._constants[col], index=pd.RangeIndex(capacity),
+                                                 dtype=self._dtypes[col]).array
+            else:
+                values = np.empty(capacity, dtype=self._dtypes[col])
+                values[:self._n] = df[col].to_numpy() if df is not None else self._arrays[col][:self._n]
+                self._arrays[col] = values
+
+
+def _is_numeric(dtype) -> bool:
+    """
+    Check whether a column dtype is a numpy dtype which can be buffered.
+    """
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def _forward(targets: list[tuple[str, str, int, str]]) -> list[tuple[str, str, int, str]]:
+    """
+    Get forward return targets.
+    """
+    return [target for target in targets if target[3] == DirectionEnum.FORWARD]
+
+
+Data.with_candles.__doc__ = Data.with_candles.__doc__.format(
+    supported_kinds=", ".join(SUPPORTED_CANDLES)
+)
@@ -0,0 +1,304 @@
+from collections.abc import Mapping
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from pricedata.io.loader import DataLoader, DataConfig, ClientConfig
+from pricedata.transforms.features import (
+    handler, indicator_targets, indicator_name, add_indicator_columns, return_targets, return_name, return_block
+)
+from pricedata.transforms.kernels import heikin_ashi
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum
+from pricedata.utils.dev_types.spec.spec import OHLCSpec, DropColumnsSpec, ReturnSpec, IndicatorSpec
+
+
+class Panel:
+    """
+    Price data of many symbols aligned on a shared index.
+
+    The data is one contiguous (symbols, time, fields) float array on the union of the indexes of all symbols. Bars
+    missing for a symbol are NaN and `present` marks the existing ones. Candles and features are computed for every
+    symbol in one vectorized call. Recursive transforms (heikin ashi candles, returns, indicators) run over the present
+    bars of each symbol only, so every symbol gets the same values as if it were transformed alone.
+    """
+    def __init__(self, values: np.ndarray, symbols: list[str], index: pd.DatetimeIndex, fields: list[str],
+                 present: np.ndarray | None = None):
+        """
+        Setting initialize parameters.
+
+        Args:
+            values (np.ndarray): (symbols, time, fields) float array
+            symbols (list[str]): symbols, in the order of the first axis
+            index (pd.DatetimeIndex): shared index, in the order of the second axis
+            fields (list[str]): field (column) names, in the order of the third axis
+            present (np.ndarray | None): (symbols, time) mask of existing bars. Default is None (every bar exists).
+        """
+        if values.shape != (len(symbols), len(index), len(fields)):
+            raise ValueError(
+                f"Shape of values {values.shape} does not match symbols, index and fields "
+                f"{(len(symbols), len(index), len(fields))}."
+            )
+        self.values = values
+        self.symbols = list(symbols)
+        self.index = index
+        self.fields = list(fields)
+        self.present = np.ones(values.shape[:2], dtype=bool) if present is None else present
+        self._order: np.ndarray | None = None
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], fields: list[str] | None = None) -> "Panel":
+        """
+        Build a panel from frames of many symbols (e.g. returned by DataLoader).
+
+        Args:
+            frames (Mapping[str, pd.DataFrame]): data keyed by symbol
+            fields (list[str] | None): fields to include. Default is None (numeric columns present in every frame).
+
+        Return:
+            Panel: the panel
+        """
+        symbols = list(frames)
+        dfs = [frames[symbol] for symbol in symbols]
+        if fields is None:
+            fields = [
+                col for col in (dfs[0].columns if dfs else [])
+                if pd.api.types.is_numeric_dtype(dfs[0][col]) and all(col in df.columns for df in dfs)
+            ]
+        index = reduce(lambda left, right: left.union(right), (df.index for df in dfs)) if dfs else pd.DatetimeIndex([])
+
+        # float32 fields (see DataConfig.compact) are kept, other numeric fields are float64
+        dtypes = [df[col].dtype for df in dfs for col in fields]
+        dtype = np.result_type(*dtypes, np.float32) if dtypes else np.float64
+        values = np.full((len(symbols), len(index), len(fields)), np.nan, dtype=dtype)
+        present = np.zeros((len(symbols), len(index)), dtype=bool)
+        for i, df in enumerate(dfs):
+            positions = index.get_indexer(df.index)
+            values[i, positions] = df[fields].to_numpy(dtype=dtype)
+            present[i, positions] = True
+        return cls(values, symbols, index, fields, present)
+
+    @classmethod
+    def load(cls, configs: list[DataConfig], client_cfg: ClientConfig, loader: DataLoader | None = None, *,
+             max_workers: int = 8, fields: list[str] | None = None) -> "Panel":
+        """
+        Load or fetch many symbols concurrently (see DataLoader.load_many) into a panel.
+
+        Args:
+            configs (list[DataConfig]): data configuration settings, one per symbol
+            client_cfg (ClientConfig): client configuration settings
+            loader (DataLoader | None): price data loader object. Default is None (a new DataLoader).
+            max_workers (int): maximal number of concurrent loads. Default is 8.
+            fields (list[str] | None): fields to include. Default is None (see from_frames).
+
+        Return:
+            Panel: the panel
+        """
+        loader = DataLoader() if loader is None else loader
+        results = loader.load_many(configs, client_cfg, max_workers=max_workers)
+        failed = [result for result in results.values() if not result.ok]
+        if failed:
+            symbols = ", ".join(result.cfg.symbol for result in failed)
+            raise RuntimeError(f"Could not load: {symbols}") from failed[0].error
+        return cls.from_frames({result.cfg.symbol: result.df for result in results.values()}, fields)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """
+        Get the number of symbols, bars and fields.
+        """
+        return self.values.shape
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        Get a (symbols, time) view of a field.
+
+        Args:
+            name (str): field name
+
+        Return:
+            np.ndarray: the view
+        """
+        return self.values[:, :, self.fields.index(name)]
+
+    def to_frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Get the present bars of a symbol as DataFrame (in the format of Data.df).
+
+        Args:
+            symbol (str): symbol
+
+        Return:
+            pd.DataFrame: the price data
+        """
+        i = self.symbols.index(symbol)
+        mask = self.present[i]
+        df = pd.DataFrame(self.values[i, mask], index=self.index[mask], columns=self.fields)
+        df.insert(0, ColumnTypeEnum.SYMBOL.value, symbol)
+        return df
+
+    def to_frames(self) -> dict[str, pd.DataFrame]:
+        """
+        Get the present bars of every symbol as DataFrames.
+
+        Return:
+            dict[str, pd.DataFrame]: the price data keyed by symbol
+        """
+        return {symbol: self.to_frame(symbol) for symbol in self.symbols}
+
+    def with_candles(self, *, kind: str = "standard", append: bool = False) -> "Panel":
+        """
+        Transform candles of every symbol to a specified kind (see Data.with_candles).
+
+        Args:
+            kind (str): specified kind
+            append (bool): if true, append new fields: ha_open, ha_high, ha_low, ha_close. Otherwise, also rewrite
+                        open, high, low, close. Default is false.
+        Return:
+            Panel object.
+        """
+        if kind.lower() in ("heikin_ashi", "heiken ashi", "ha"):
+            ohlc = self._packed(self._fields(ColumnTypeSetEnum.OHLC.value))
+            open_ha, high_ha, low_ha, close_ha = heikin_ashi(*(ohlc[:, :, j] for j in range(4)))
+            candles = self._unpacked(np.stack([close_ha, open_ha, high_ha, low_ha], axis=2))
+            names = [ColumnTypeEnum.CLOSE_HA, ColumnTypeEnum.OPEN_HA, ColumnTypeEnum.HIGH_HA, ColumnTypeEnum.LOW_HA]
+            self._set_fields([str(name) for name in names], candles)
+            if not append:
+                self._set_fields(ColumnTypeSetEnum.OHLC.value, candles[:, :, [1, 2, 3, 0]])
+        elif kind.lower() == "standard":
+            pass
+        else:
+            raise ValueError(f"Unknown candle type: {kind}")
+        return self
+
+    def with_features(self, spec: OHLCSpec | ReturnSpec | IndicatorSpec) -> "Panel":
+        """
+        Add fields of a given specification for every symbol (see Data.with_features).
+
+        Args:
+            spec (OHLCSpec | ReturnSpec | IndicatorSpec): specification
+
+        Return:
+            Panel object.
+        """
+        if isinstance(spec, OHLCSpec):
+            self._add_price_averages([(ck, fk) for ck in spec.candle_kinds for fk in spec.feature_kinds])
+        elif isinstance(spec, ReturnSpec):
+            self._add_returns(return_targets(spec))
+        elif isinstance(spec, IndicatorSpec):
+            self._add_indicators(indicator_targets(spec))
+        else:
+            raise TypeError(f"Unsupported specification: {type(spec).__name__}")
+        return self
+
+    def drop_columns(self, spec: DropColumnsSpec) -> "Panel":
+        """
+        Drop fields.
+
+        Args:
+            spec (DropColumnsSpec): specification
+
+        Return:
+            Panel object.
+        """
+        dropped = set(spec.cols) - {ColumnTypeEnum.SYMBOL}
+        missing = dropped - set(self.fields)
+        if missing:
+            raise KeyError(f"{sorted(missing)} not found in fields")
+        keep = [i for i, name in enumerate(self.fields) if name not in dropped]
+        self.values = np.ascontiguousarray(self.values[:, :, keep])
+        self.fields = [self.fields[i] for i in keep]
+        return self
+
+    def _add_price_averages(self, targets: list) -> None:
+        """
+        Add price averages of every symbol with one matrix product (see transforms.features.add_price_averages).
+        """
+        targets = [handler[ck][fk] for ck, fk in targets]
+        if not targets:
+            return
+        sources = list(dict.fromkeys(col for _, cols in targets for col in cols))
+        weights = np.zeros((len(sources), len(targets)))
+        for j, (_, cols) in enumerate(targets):
+            for col in cols:
+                weights[sources.index(col), j] += 1.0 / len(cols)
+        weights = weights.astype(self.values.dtype)
+        self._set_fields([name for name, _ in targets], self._fields(sources) @ weights)
+
+    def _add_returns(self, targets: list) -> None:
+        """
+        Add returns of every symbol between its present bars (see transforms.features.add_return_columns).
+        """
+        if not targets:
+            return
+        sources = list(dict.fromkeys(src for _, src, _, _ in targets))
+        # (symbols, sources, time): every symbol and source of a horizon in one division
+        x = np.moveaxis(self._packed(self._fields(sources)), 1, 2)
+        out = return_block(x, targets, sources, lengths=self.present.sum(axis=1))
+        self._set_fields([return_name(*target) for target in targets], self._unpacked(np.moveaxis(out, 1, 2)))
+
+    def _add_indicators(self, targets: list) -> None:
+        """
+        Add rolling indicators of every symbol (see transforms.features.add_indicator_columns).
+
+        Indicator kernels run along one series, so they are computed symbol by symbol over the present bars.
+        """
+        if not targets:
+            return
+        names = [indicator_name(*target) for target in targets]
+        out = np.full(self.values.shape[:2] + (len(names),), np.nan, dtype=self.values.dtype)
+        for i in range(len(self.symbols)):
+            mask = self.present[i]
+            df = pd.DataFrame(self.values[i, mask], columns=self.fields)
+            add_indicator_columns(df, targets)
+            out[i, mask] = df[names].to_numpy()
+        self._set_fields(names, out)
+
+    def _fields(self, names: list[str]) -> np.ndarray:
+        """
+        Get (symbols, time, len(names)) values of given fields.
+        """
+        missing = [name for name in names if name not in self.fields]
+        if missing:
+            raise KeyError(f"{missing} not found in fields")
+        return self.values[:, :, [self.fields.index(name) for name in names]]
+
+    def _set_fields(self, names: list[str], values: np.ndarray) -> None:
+        """
+        Write (symbols, time, len(names)) values of given fields, appending new fields at the end.
+        """
+        new = [name for name in dict.fromkeys(names) if name not in self.fields]
+        if new:
+            grown = np.empty(self.values.shape[:2] + (len(self.fields) + len(new),), dtype=self.values.dtype)
+            grown[:, :, :len(self.fields)] = self.values
+            self.values = grown
+            self.fields.extend(new)
+        for j, name in enumerate(names):
+            self.values[:, :, self.fields.index(name)] = values[:, :, j]
+
+    def _packed(self, values: np.ndarray) -> np.ndarray:
+        """
+        Move the present bars of every symbol to the front of the time axis, in time order.
+        """
+        if self.present.all():
+            return values
+        return np.take_along_axis(values, self._present_order()[:, :, None], axis=1)
+
+    def _unpacked(self, values: np.ndarray) -> np.ndarray:
+        """
+        Move packed values back to the positions of the present bars. Missing bars are NaN.
+        """
+        if self.present.all():
+            return values
+        out = np.empty_like(values)
+        np.put_along_axis(out, self._present_order()[:, :, None], values, axis=1)
+        out[~self.present] = np.nan
+        return out
+
+    def _present_order(self) -> np.ndarray:
+        """
+        Get the time positions of every symbol: present bars first, in time order.
+        """
+        if self._order is None:
+            self._order = np.argsort(~self.present, axis=1, kind="stable")
+        return self._order
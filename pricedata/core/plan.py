@@ -0,0 +1,297 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from pricedata.transforms.features import (
+    RETURN_PREFIX, handler, indicator_targets, indicator_name, indicator_sources, return_targets, return_name
+)
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum, CandleKindEnum
+from pricedata.utils.dev_types.spec.spec import OHLCSpec, ReturnSpec, IndicatorSpec
+
+
+@dataclass(slots=True)
+class PlanStep:
+    """
+    A single step of the Data pipeline.
+
+    Operations:
+    -> load: load data with DataLoader
+    -> candles: heikin ashi candles, args: append
+    -> averages: price averages, args: targets - list of (candle kind, average kind)
+    -> returns: returns, args: targets - list of (return kind, source column, horizon, direction)
+    -> indicators: rolling indicators, args: targets - list of (indicator kind, window, source column)
+    -> features: any other feature specification, args: spec
+    -> drop: drop columns, args: cols, optional - columns which may be missing (their creation was pruned)
+    """
+    op: str
+    args: dict = field(default_factory=dict)
+
+
+def feature_steps(spec) -> list[PlanStep]:
+    """
+    Translate a feature specification into plan steps.
+
+    Targets of price averages, returns and indicators are compiled once per specification (see _compile), every
+    call gets new steps, as the optimizer may change them.
+
+    Args:
+        spec (OHLCSpec | ReturnSpec | IndicatorSpec): feature specification
+
+    Return:
+        list[PlanStep]: the steps
+    """
+    if isinstance(spec, OHLCSpec | ReturnSpec | IndicatorSpec):
+        op, targets = _compile(spec)
+        return [PlanStep(op, dict(targets=list(targets)))]
+    return [PlanStep("features", dict(spec=spec))]
+
+
+@lru_cache(maxsize=1024)
+def _compile(spec: OHLCSpec | ReturnSpec | IndicatorSpec) -> tuple[str, tuple]:
+    """
+    Get the operation and targets of a specification. Memoized: specifications are frozen and hashable.
+    """
+    if isinstance(spec, OHLCSpec):
+        return "averages", tuple((ck, fk) for ck in spec.candle_kinds for fk in spec.feature_kinds)
+    if isinstance(spec, ReturnSpec):
+        return "returns", tuple(return_targets(spec))
+    return "indicators", tuple(indicator_targets(spec))
+
+
+def outputs(step: PlanStep) -> list[str] | None:
+    """
+    Get columns written by a step (for drop: the dropped columns). None means unknown.
+    """
+    if step.op == "candles":
+        # in the order of creation (see transforms.candles.to_heikin_ashi)
+        written = [ColumnTypeEnum.CLOSE_HA, ColumnTypeEnum.OPEN_HA, ColumnTypeEnum.HIGH_HA, ColumnTypeEnum.LOW_HA]
+        return written if step.args["append"] else written + list(ColumnTypeSetEnum.OHLC.value)
+    if step.op == "averages":
+        return [handler[ck][fk][0] for ck, fk in step.args["targets"]]
+    if step.op == "returns":
+        return [return_name(*target) for target in step.args["targets"]]
+    if step.op == "indicators":
+        return [indicator_name(*target) for target in step.args["targets"]]
+    if step.op == "drop":
+        return list(step.args["cols"])
+    if step.op == "load":
+        return []
+    return None
+
+
+def inputs(step: PlanStep) -> list[str] | None:
+    """
+    Get columns read by a step. None means unknown (any column).
+    """
+    if step.op == "candles":
+        return list(ColumnTypeSetEnum.OHLC.value)
+    if step.op == "averages":
+        return [col for ck, fk in step.args["targets"] for col in handler[ck][fk][1]]
+    if step.op == "returns":
+        return [src for _, src, _, _ in step.args["targets"]]
+    if step.op == "indicators":
+        return [col for kind, _, src in step.args["targets"] for col in indicator_sources(kind, src)]
+    if step.op in ("drop", "load"):
+        return []
+    return None
+
+
+def optimize(steps: list[PlanStep]) -> list[PlanStep]:
+    """
+    Optimize a plan.
+
+    Optimization contains:
+    -> skip everything before the last load
+    -> skip steps which repeat an earlier step whose inputs and outputs have not changed since
+    -> prune outputs which are dropped later without being read (and steps without any output left)
+    -> merge steps of the same operation (averages, returns, indicators, drop), if no step in between depends on them
+    -> remove duplicated targets of merged steps
+
+    Args:
+        steps (list[PlanStep]): plan steps, in order
+
+    Return:
+        list[PlanStep]: optimized plan steps
+    """
+    steps = [PlanStep(s.op, dict(s.args)) for s in since_last_load(steps)]
+    steps = _skip_repeated(steps)
+    steps = _prune(steps)
+    steps = _merge(steps)
+    return steps
+
+
+def signature(step: PlanStep) -> list:
+    """
+    Get the canonical, json-serializable description of a step (equal for steps computing the same columns).
+
+    Args:
+        step (PlanStep): plan step with known outputs
+
+    Return:
+        list: operation and sorted targets (or columns)
+    """
+    if step.op in ("averages", "returns", "indicators"):
+        return [step.op, sorted([str(item) for item in target] for target in step.args["targets"])]
+    if step.op == "candles":
+        return [step.op, bool(step.args["append"])]
+    return [step.op, sorted(map(str, step.args.get("cols", ())))]
+
+
+def since_last_load(steps: list[PlanStep]) -> list[PlanStep]:
+    """
+    Get steps starting from the last load (the earlier ones have no effect on the result).
+    """
+    loads = [i for i, step in enumerate(steps) if step.op == "load"]
+    return steps[loads[-1]:] if loads else list(steps)
+
+
+def column_order(columns: list[str], steps: list[PlanStep]) -> list[str] | None:
+    """
+    Predict the order of columns after running steps one by one (new columns are appended at the end).
+
+    Args:
+        columns (list[str]): columns before the first step
+        steps (list[PlanStep]): plan steps, without load
+
+    Return:
+        list[str] | None: the columns, or None if any step has unknown outputs
+    """
+    cols = list(columns)
+    for step in steps:
+        outs = outputs(step)
+        if outs is None:
+            return None
+        if step.op == "drop":
+            cols = [col for col in cols if col not in outs]
+        else:
+            cols.extend(col for col in dict.fromkeys(outs) if col not in cols)
+    return cols
+
+
+def explain(steps: list[PlanStep]) -> str:
+    """
+    Describe plan steps in a human-readable form.
+
+    Args:
+        steps (list[PlanStep]): plan steps
+
+    Return:
+        str: one numbered line per step
+    """
+    lines = []
+    for i, step in enumerate(steps, start=1):
+        if step.op == "candles":
+            detail = f"{CandleKindEnum.HA} ({'append' if step.args['append'] else 'rewrite ohlc'})"
+        elif step.op in ("averages", "returns", "indicators", "drop"):
+            detail = ", ".join(outputs(step))
+        elif step.op == "features":
+            detail = repr(step.args["spec"])
+        else:
+            detail = ""
+        lines.append(f"{i}. {step.op}" + (f": {detail}" if detail else ""))
+    return "\n".join(lines)
+
+
+def _skip_repeated(steps: list[PlanStep]) -> list[PlanStep]:
+    """
+    Remove steps equal to an earlier step, if nothing in between (nor the earlier step itself) changed their inputs.
+    """
+    kept = []
+    for step in steps:
+        ins, outs = inputs(step), outputs(step)
+        repeated = False
+        # a repeated drop is not a no-op: it fails, as in eager mode
+        if step.op not in ("load", "drop") and ins is not None and outs is not None and not set(ins) & set(outs):
+            for earlier in reversed(kept):
+                if earlier == step:
+                    repeated = True
+                    break
+                earlier_outs = outputs(earlier)
+                if earlier_outs is None or set(earlier_outs) & (set(ins) | set(outs)):
+                    break
+        if not repeated:
+            kept.append(step)
+    return kept
+
+
+def _prune(steps: list[PlanStep]) -> list[PlanStep]:
+    """
+    Remove outputs which are dropped later without being read in between.
+
+    Dropped columns, whose creation was pruned, are marked as optional in the drop step (they may be missing then).
+    """
+    dead: dict[str, PlanStep] = {}  # column -> drop step which removes it
+    kept = []
+    for step in reversed(steps):
+        if step.op == "drop":
+            dead.update((col, step) for col in step.args["cols"])
+            kept.append(step)
+            continue
+
+        ins, outs = inputs(step), outputs(step)
+        if ins is None or outs is None:
+            # unknown step may read anything
+            dead.clear()
+            kept.append(step)
+            continue
+
+        if step.op in ("averages", "returns", "indicators"):
+            targets = []
+            for target, col in zip(step.args["targets"], outs):
+                if col in dead:
+                    _mark_optional(dead[col], col)
+                else:
+                    targets.append(target)
+            if not targets:
+                continue
+            step.args["targets"] = targets
+            outs = outputs(step)
+        elif step.op == "candles" and step.args["append"] and all(col in dead for col in outs):
+            for col in outs:
+                _mark_optional(dead[col], col)
+            continue
+
+        for col in (*ins, *outs):
+            dead.pop(col, None)
+        kept.append(step)
+
+    kept.reverse()
+    return kept
+
+
+def _mark_optional(drop: PlanStep, col: str) -> None:
+    """
+    Mark a column of a drop step as optional.
+    """
+    drop.args["optional"] = drop.args.get("optional", frozenset()) | {col}
+
+
+def _merge(steps: list[PlanStep]) -> list[PlanStep]:
+    """
+    Merge steps of the same mergeable operation, moving a later step back over independent steps.
+    """
+    merged: list[PlanStep] = []
+    for step in steps:
+        target = None
+        if step.op in ("averages", "returns", "indicators", "drop"):
+            ins, outs = set(inputs(step)), set(outputs(step))
+            for earlier in reversed(merged):
+                if earlier.op == step.op:
+                    # dropping a column twice fails (as in eager mode), so such drops are not merged
+                    if step.op != "drop" or not set(earlier.args["cols"]) & outs:
+                        target = earlier
+                    break
+                earlier_ins, earlier_outs = inputs(earlier), outputs(earlier)
+                if earlier_ins is None or earlier_outs is None:
+                    break
+                if set(earlier_outs) & (ins | outs) or set(earlier_ins) & outs:
+                    break
+        if target is None:
+            merged.append(step)
+        elif step.op == "drop":
+            target.args["cols"] = list(dict.fromkeys([*target.args["cols"], *step.args["cols"]]))
+            optional = target.args.get("optional", frozenset()) | step.args.get("optional", frozenset())
+            if optional:
+                target.args["optional"] = optional
+        else:
+            target.args["targets"] = list(dict.fromkeys([*target.args["targets"], *step.args["targets"]]))
+    return merged
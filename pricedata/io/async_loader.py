@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+import asyncio
+import inspect
+
+import pandas as pd
+
+from pricedata.io.loader import DataLoader, DataConfig, ClientConfig, LoadResult, _check_unique_keys
+from pricedata.io.storage import get_storage
+from pricedata.utils.profiling import span
+
+
+@dataclass(slots=True)
+class AsyncDataLoader:
+    """
+    The asyncio counterpart of DataLoader.
+
+    Paths, storage formats, normalization, the client and the rate limiter are taken from the wrapped DataLoader.
+    The client may be any object with the get_hist interface of TvDatafeed; if get_hist is a coroutine function it is
+    awaited, otherwise it runs in a worker thread. Cached data is looked up (with the same resolution order as
+    DataLoader.load_or_fetch, including resampling of finer intervals), read and written in worker threads as well,
+    so the event loop is never blocked. Profiling events are emitted to the profiler of the wrapped DataLoader (spans of
+    concurrent tasks overlap in the thread of the event loop).
+    """
+    loader: DataLoader = field(default_factory=DataLoader)
+    max_concurrency: int = 8
+
+    async def aload_or_fetch(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Load data from given path or fetch data from TradingView via TvDatafeed.
+
+        Args:
+            cfg (DataConfig): data configuration setting
+            client_cfg (ClientConfig): client configuration settings
+
+        Return:
+            pd.DataFrame: OHLCV standard japanese candlestick price data.
+        """
+        profiler = self.loader.profiler
+        with span(profiler, "load_or_fetch", "loader", symbol=cfg.symbol, interval=cfg.interval) as event:
+            df = await self._aload_or_fetch(cfg, client_cfg)
+            if cfg.compact:
+                df = self.loader._compact_df(df)
+            if event is not None:
+                event.record(df)
+        return df
+
+    async def _aload_or_fetch(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Load or fetch data in the full precision (see aload_or_fetch).
+        """
+        # the same resolution as DataLoader: cache file, cached superset, resampled finer interval, then fetch
+        df = await asyncio.to_thread(self.loader._load_cached, cfg)
+        if df is not None:
+            return df
+
+        p = self.loader._cache_path(cfg)
+        self.loader._instant("cache miss", path=p)
+        df = await self._afetch(cfg, client_cfg)
+        await asyncio.to_thread(self.loader._write, get_storage(cfg.storage_format), df, p, cfg)
+        return df
+
+    async def aload_many(self, configs: list[DataConfig], client_cfg: ClientConfig, *,
+                         max_concurrency: int | None = None) -> dict[tuple[str, str], LoadResult]:
+        """
+        Load or fetch many configurations concurrently.
+
+        At most max_concurrency loads run at the same time. An error of one configuration does not stop the others,
+        it is returned in its LoadResult. Configurations with the same symbol and interval raise ValueError (see
+        DataLoader.load_many).
+
+        Args:
+            configs (list[DataConfig]): data configuration settings to load
+            client_cfg (ClientConfig): client configuration settings
+            max_concurrency (int | None): maximal number of concurrent loads. Default is self.max_concurrency.
+
+        Return:
+            dict[tuple[str, str], LoadResult]: results keyed by (symbol, interval), in the order of configs
+        """
+        _check_unique_keys(configs)
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(cfg: DataConfig) -> LoadResult:
+            async with semaphore:
+                try:
+                    return LoadResult(cfg, df=await self.aload_or_fetch(cfg, client_cfg))
+                except Exception as expectation:
+                    return LoadResult(cfg, error=expectation)
+
+        results = await asyncio.gather(*(run(cfg) for cfg in configs))
+        return {(r.cfg.symbol, r.cfg.interval): r for r in results}
+
+    async def _afetch(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Download price data with non-blocking retries and exponential backoff (no backoff after the last attempt).
+
+        Args:
+            cfg (DataConfig): data configuration settings
+            client_cfg (ClientConfig): client configuration settings
+
+        Return:
+            pd.DataFrame: the OHLCV price data
+        """
+        client = self.loader.client
+        if client is None:
+            # creating TvDatafeed client logs in over the network
+            client = await asyncio.to_thread(self.loader._get_client, client_cfg)
+        request = self.loader._hist_request(cfg)
+        rate_limiter = self.loader.rate_limiter
+
+        delay = self.loader.fetch_delay
+        last_err: Exception | None = None
+        for i in range(self.loader.fetch_attempts):
+            try:
+                with span(self.loader.profiler, "fetch attempt", "loader", attempt=i + 1) as event:
+                    if rate_limiter is not None:
+                        with span(self.loader.profiler, "rate limit wait", "loader"):
+                            await rate_limiter.acquire_async()
+                    if inspect.iscoroutinefunction(client.get_hist):
+                        df = await client.get_hist(**request)
+                    else:
+                        df = await asyncio.to_thread(client.get_hist, **request)
+                    if event is not None and df is not None:
+                        event.record(df)
+                    return self.loader._checked_hist(df, cfg)
+            except Exception as expectation:
+                last_err = expectation
+                if i + 1 == self.loader.fetch_attempts:
+                    break
+                with span(self.loader.profiler, "backoff", "loader", delay=delay):
+                    await asyncio.sleep(delay)
+                delay *= 2
+
+        raise self.loader._fetch_error(cfg, last_err)
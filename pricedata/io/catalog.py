@@ -0,0 +1,246 @@
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    # file locks between processes are not available (e.g. on Windows), updates are still atomic
+    fcntl = None
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    """
+    Description of a single cached dataset.
+    """
+    path: str
+    symbol: str
+    interval: str
+    n_bars: int
+    first: str | None
+    last: str | None
+    storage_format: str
+    checksum: str
+
+    @property
+    def first_ts(self) -> pd.Timestamp | None:
+        return None if self.first is None else pd.Timestamp(self.first)
+
+    @property
+    def last_ts(self) -> pd.Timestamp | None:
+        return None if self.last is None else pd.Timestamp(self.last)
+
+
+class CacheCatalog:
+    """
+    Manifest of every dataset cached under base_dir.
+
+    The manifest is a single json file (base_dir/manifest.json) which records symbol, interval, first and last
+    timestamp, number of bars, storage format and checksum of every cache file. It is updated atomically (written to
+    a temporary file and swapped in, under a lock) on every save, so coverage queries do not need to walk the
+    directory tree or open cache files.
+    """
+    FILE_NAME = "manifest.json"
+    _locks: dict[Path, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, base_dir: Path):
+        """
+        Setting initialize parameters.
+
+        Args:
+            base_dir (Path): directory with cached data (the same as DataConfig.base_dir)
+        """
+        self.base_dir = Path(base_dir).resolve()
+        self.path = self.base_dir / self.FILE_NAME
+
+    def exists(self) -> bool:
+        """
+        Check whether the manifest file exists.
+        """
+        return self.path.exists()
+
+    def entries(self) -> list[CatalogEntry]:
+        """
+        Read all entries of the manifest.
+
+        Return:
+            list[CatalogEntry]: the entries, empty if the manifest does not exist
+        """
+        return list(self._read().values())
+
+    def find(self, symbol: str, interval: str | None = None, storage_format: str | None = None) -> list[CatalogEntry]:
+        """
+        Find entries of a given symbol, optionally of a given interval and storage format.
+
+        Args:
+            symbol (str): symbol in format EXCHANGE:TICKER
+            interval (str | None): bar interval. Default is None (any interval).
+            storage_format (str | None): storage format. Default is None (any format).
+
+        Return:
+            list[CatalogEntry]: matching entries
+        """
+        return [
+            e for e in self._read().values()
+            if e.symbol == symbol
+            and (interval is None or e.interval == interval)
+            and (storage_format is None or e.storage_format == storage_format)
+        ]
+
+    def record(self, path: Path, df: pd.DataFrame, *, symbol: str, interval: str, storage_format: str) -> CatalogEntry:
+        """
+        Add (or replace) an entry of a written cache file.
+
+        Args:
+            path (Path): path to the cache file
+            df (pd.DataFrame): written data
+            symbol (str): symbol in format EXCHANGE:TICKER
+            interval (str): bar interval
+            storage_format (str): storage format
+
+        Return:
+            CatalogEntry: the recorded entry
+        """
+        entry = self.entry(path, df, symbol=symbol, interval=interval, storage_format=storage_format)
+        with self._lock():
+            entries = self._read()
+            entries[entry.path] = entry
+            self._write(entries)
+        return entry
+
+    def entry(self, path: Path, df: pd.DataFrame, *, symbol: str, interval: str, storage_format: str) -> CatalogEntry:
+        """
+        Describe a cache file, without recording it (see record).
+
+        Args:
+            path (Path): path to the cache file
+            df (pd.DataFrame): data of the file
+            symbol (str): symbol in format EXCHANGE:TICKER
+            interval (str): bar interval
+            storage_format (str): storage format
+
+        Return:
+            CatalogEntry: the entry
+        """
+        return CatalogEntry(
+            path=self._key(path),
+            symbol=symbol,
+            interval=interval,
+            n_bars=len(df),
+            first=df.index[0].isoformat() if len(df) else None,
+            last=df.index[-1].isoformat() if len(df) else None,
+            storage_format=str(storage_format),
+            checksum=checksum(path),
+        )
+
+    def reset(self, entries: list[CatalogEntry]) -> None:
+        """
+        Replace every entry of the manifest.
+
+        Args:
+            entries (list[CatalogEntry]): the new entries
+        """
+        with self._lock():
+            self._write({e.path: e for e in entries})
+
+    def seed(self, entries: list[CatalogEntry]) -> None:
+        """
+        Add entries of files which are not recorded yet. Recorded entries win, so seeding with a (possibly stale)
+        directory scan never overrides files recorded concurrently.
+
+        Args:
+            entries (list[CatalogEntry]): entries to add
+        """
+        with self._lock():
+            recorded = self._read()
+            self._write({e.path: e for e in entries} | recorded)
+
+    def remove(self, path: Path) -> None:
+        """
+        Remove an entry of a cache file (if any).
+
+        Args:
+            path (Path): path to the cache file
+        """
+        with self._lock():
+            entries = self._read()
+            if entries.pop(self._key(path), None) is not None:
+                self._write(entries)
+
+    def resolve(self, entry: CatalogEntry) -> Path:
+        """
+        Get the absolute path of an entry.
+        """
+        return self.base_dir / entry.path
+
+    def _key(self, path: Path) -> str:
+        return Path(path).resolve().relative_to(self.base_dir).as_posix()
+
+    def _read(self) -> dict[str, CatalogEntry]:
+        try:
+            raw = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        return {e["path"]: CatalogEntry(**e) for e in raw["entries"]}
+
+    def _write(self, entries: dict[str, CatalogEntry]) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.FILE_NAME}.tmp-{os.getpid()}-{threading.get_ident()}")
+        tmp.write_text(json.dumps({"version": 1, "entries": [asdict(e) for e in entries.values()]}, indent=1))
+        os.replace(tmp, self.path)
+
+    def _lock(self) -> "_CatalogLock":
+        with self._locks_guard:
+            lock = self._locks.setdefault(self.path, threading.Lock())
+        return _CatalogLock(lock, self.path.with_name(f"{self.FILE_NAME}.lock"))
+
+
+class _CatalogLock:
+    """
+    Lock of the manifest between threads (and processes, where file locks are available).
+    """
+    def __init__(self, lock: threading.Lock, lock_path: Path):
+        self._lock = lock
+        self._lock_path = lock_path
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if fcntl is not None:
+            self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._lock_path, "w")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+
+
+def checksum(path: Path) -> str:
+    """
+    Compute the blake2b checksum of a cache file (or of all files of a memmap directory).
+
+    Args:
+        path (Path): path to the cache file
+
+    Return:
+        str: hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        with open(file, "rb") as f:
+            while block := f.read(1 << 20):
+                digest.update(block)
+    return digest.hexdigest()
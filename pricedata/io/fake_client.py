@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from pricedata.io.rate_limit import RateLimiter
+from pricedata.utils.synthetic import make_ohlcv
+
+
+class FakeClientError(ConnectionError):
+    """
+    A simulated failure of the fake client (a dropped connection or a rejected request).
+    """
+
+
+@dataclass(slots=True)
+class FakeClientStats:
+    """
+    Counters of the fake client.
+    """
+    requests: int = 0
+    served: int = 0
+    failed: int = 0
+    empty: int = 0
+    rate_limited: int = 0
+    bars: int = 0
+
+
+@dataclass(slots=True)
+class FakeTvClient:
+    """
+    Offline stand-in for TvDatafeed, with the same get_hist interface.
+
+    Bars are served from recorded data (keyed by "EXCHANGE:TICKER", e.g. frames loaded by DataLoader) or generated
+    (see utils.synthetic.make_ohlcv), deterministic for the symbol, interval, number of bars and the last bar, which
+    is the last complete bar before now. Every request waits latency seconds plus an exponentially distributed jitter
+    (a long tail), then fails with probability failure_rate (raises FakeClientError) or returns no data with
+    probability empty_rate (None, as TvDatafeed does). Requests over the rate limit (rate requests per second, in
+    bursts of at most burst requests) are rejected with FakeClientError. The client is thread-safe, e.g.:
+    DataLoader(client=FakeTvClient(latency=0.05, failure_rate=0.1, rate=10.0))
+
+    Args:
+        recorded (dict[str, pd.DataFrame]): recorded bars served instead of generated ones. Default is empty.
+        latency (float): minimal time of a request in seconds. Default is 0.0.
+        jitter (float): mean of the random time added to latency, in seconds. Default is 0.0.
+        failure_rate (float): probability that a request fails. Default is 0.0.
+        empty_rate (float): probability that a request returns no data. Default is 0.0.
+        rate (float | None): maximal number of requests per second, None for no limit. Default is None.
+        burst (int): number of requests allowed at once under the rate limit. Default is 1.
+        seed (int): seed of latency, failures and generated bars. Default is 0.
+    """
+    recorded: dict[str, pd.DataFrame] = field(default_factory=dict)
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    empty_rate: float = 0.0
+    rate: float | None = None
+    burst: int = 1
+    seed: int = 0
+    _limiter: RateLimiter | None = field(init=False, repr=False, default=None)
+    _rng: np.random.Generator = field(init=False, repr=False)
+    _stats: FakeClientStats = field(init=False, repr=False, default_factory=FakeClientStats)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self):
+        if not 0.0 <= self.failure_rate <= 1.0 or not 0.0 <= self.empty_rate <= 1.0:
+            raise ValueError("FakeTvClient requires failure_rate and empty_rate between 0 and 1.")
+        if self.latency < 0.0 or self.jitter < 0.0:
+            raise ValueError("FakeTvClient requires non-negative latency and jitter.")
+        if self.rate is not None:
+            self._limiter = RateLimiter(rate=self.rate, capacity=self.burst)
+        self._rng = np.random.default_rng(self.seed)
+
+    def get_hist(self, symbol: str, exchange: str = "NSE", interval="1D", n_bars: int = 10,
+                 fut_contract: int | None = None, extended_session: bool = False) -> pd.DataFrame | None:
+        """
+        Get historical bars, in the format of TvDatafeed.get_hist: a naive "datetime" index and symbol, open, high,
+        low, close, volume columns.
+
+        Args:
+            symbol (str): ticker
+            exchange (str): exchange. Default is "NSE".
+            interval (Interval | str): tvDatafeed interval, e.g. Interval.in_1_hour or "1H". Default is "1D".
+            n_bars (int): number of bars. Default is 10.
+            fut_contract (int | None): ignored. Default is None.
+            extended_session (bool): ignored. Default is false.
+
+        Return:
+            pd.DataFrame | None: the last n_bars bars, None for a simulated empty response
+        """
+        with self._lock:
+            self._stats.requests += 1
+            wait = self.latency + (self._rng.exponential(self.jitter) if self.jitter > 0.0 else 0.0)
+            outcome = self._rng.random()
+        if wait > 0.0:
+            time.sleep(wait)
+
+        if self._limiter is not None and self._limiter.try_acquire() > 0.0:
+            self._count("rate_limited")
+            raise FakeClientError("429 Too Many Requests (simulated)")
+        if outcome < self.failure_rate:
+            self._count("failed")
+            raise FakeClientError("Connection reset (simulated)")
+        if outcome < self.failure_rate + self.empty_rate:
+            self._count("empty")
+            return None
+
+        df = self._bars(f"{exchange}:{symbol}", interval, n_bars)
+        with self._lock:
+            self._stats.served += 1
+            self._stats.bars += len(df)
+        return df
+
+    def stats(self) -> FakeClientStats:
+        """
+        Get a snapshot of the client counters.
+
+        Return:
+            FakeClientStats: numbers of requests, served, failed, empty and rate limited responses and served bars
+        """
+        with self._lock:
+            return FakeClientStats(**{name: getattr(self._stats, name) for name in FakeClientStats.__slots__})
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self._stats, name, getattr(self._stats, name) + 1)
+
+    def _bars(self, full_symbol: str, interval, n_bars: int) -> pd.DataFrame:
+        """
+        Get recorded or generated bars in the format of TvDatafeed.get_hist.
+        """
+        recorded = self.recorded.get(full_symbol)
+        if recorded is not None:
+            df = recorded.iloc[-n_bars:]
+            if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+                df = df.tz_convert(None)
+            return df.rename_axis("datetime").copy()
+
+        freq = _interval_freq(interval)
+        now = pd.Timestamp.now(tz="UTC")
+        offset = pd.tseries.frequencies.to_offset(freq)
+        # the last complete bar; calendar intervals (weeks, months) end at the last anchor before now
+        if isinstance(offset, pd.offsets.Tick):
+            last = now.floor(offset) - offset
+        else:
+            last = offset.rollback(now.normalize()) - offset
+        start = pd.date_range(end=last, periods=n_bars, freq=offset)[0]
+        seed = zlib.crc32(f"{full_symbol}/{freq}/{n_bars}/{last}".encode()) ^ self.seed
+        return make_ohlcv(n_bars, seed=seed, symbol=full_symbol, freq=freq, start=start.isoformat(), raw=True)
+
+
+def _interval_freq(interval) -> str:
+    """
+    Get the pandas frequency of a tvDatafeed interval ("1", "45", "1H", "1D", "1W", "1M" or an Interval member).
+    """
+    value = str(getattr(interval, "value", interval)).strip().upper()
+    if value.isdigit():
+        return f"{value}min"
+    number, unit = value[:-1] or "1", value[-1:]
+    freq = {"H": "h", "D": "D", "W": "W-MON", "M": "MS"}.get(unit)
+    if freq is None or not number.isdigit():
+        raise ValueError(f"Unsupported interval: '{interval}'")
+    return f"{number}{freq}"
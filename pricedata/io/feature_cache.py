@@ -0,0 +1,248 @@
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pricedata.io.storage import MemmapStorage, get_storage, get_storage_format
+from pricedata.utils.dev_types.dev_types import StorageFormatEnum
+
+# bump to invalidate every cached feature (e.g. after a change of a feature kernel or of the fingerprint)
+FEATURE_CACHE_VERSION = 2
+
+# rows of the source data hashed by fingerprint: evenly spaced samples and the last rows
+SAMPLE_ROWS = 4096
+TAIL_ROWS = 256
+
+
+@dataclass(slots=True)
+class FeatureCacheStats:
+    """
+    Counters of the feature cache.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FeatureCache:
+    """
+    Persistent, content-addressed cache of computed feature columns.
+
+    An entry is keyed by the canonical description of the feature (e.g. price averages with their candle kinds) and
+    by the fingerprint of the source data: index, names, dtypes, sampled values and checksums of the columns read by
+    the feature (see fingerprint). Data loaded from a cache file is identified by the file (with its modification time)
+    and the transforms applied since instead of the checksums, so a hit does not read the whole source data. The same
+    features of the same data are computed once, also across processes.
+
+    Entries are stored as columnar files in base_dir (memory-mapped by default, so a hit attaches the mapped columns
+    without reading them). The least recently used entries are removed to keep the total size under max_bytes.
+    Counters are kept per instance.
+    """
+    def __init__(self, base_dir: Path, max_bytes: int = 1024 ** 3, storage_format: str = "memmap"):
+        """
+        Setting initialize parameters.
+
+        Args:
+            base_dir (Path): directory of the cached features
+            max_bytes (int): disk budget in bytes. Default is 1 GiB.
+            storage_format (str): storage format of entries, "memmap" or "npz". Default is "memmap".
+        """
+        storage_format = get_storage_format(storage_format)
+        if storage_format not in (StorageFormatEnum.MEMMAP, StorageFormatEnum.NPZ):
+            raise ValueError(f"Feature cache supports memmap and npz storage formats, got {storage_format}.")
+
+        self.base_dir = Path(base_dir)
+        self.max_bytes = max_bytes
+        self._storage = get_storage(storage_format)
+        self._stats = FeatureCacheStats()
+        self._lock = threading.Lock()
+
+    def key(self, df: pd.DataFrame, sources: list[str], feature: object, identity: str | None = None) -> str:
+        """
+        Compute the key of features of given data.
+
+        Args:
+            df (pd.DataFrame): data from which features are computed
+            sources (list[str]): columns read by the features
+            feature (object): canonical, json-serializable description of the features
+            identity (str | None): cheap identity of the data, e.g. its cache file with the modification time and the
+                        transforms applied since. If given, the values are only sampled (no checksums, see
+                        fingerprint). Default is None.
+
+        Return:
+            str: hex key
+        """
+        h = blake2b(digest_size=20)
+        h.update(json.dumps([FEATURE_CACHE_VERSION, feature, identity], default=str).encode())
+        h.update(fingerprint(df, sources, checksums=identity is None).encode())
+        return h.hexdigest()
+
+    def get(self, key: str, n_rows: int) -> dict[str, np.ndarray] | None:
+        """
+        Get cached feature columns.
+
+        Args:
+            key (str): key of the features
+            n_rows (int): expected number of rows
+
+        Return:
+            dict[str, np.ndarray] | None: writable arrays of the feature columns keyed by name (memory mapped
+                copy-on-write, or read into memory from npz), None if there is no valid entry
+        """
+        path = self._path(key)
+        try:
+            if isinstance(self._storage, MemmapStorage):
+                columns = self._storage.read_columns(path)
+            else:
+                columns = {col: np.array(values) for col, values in self._storage.read(path).items()}
+        except (FileNotFoundError, NotADirectoryError, ValueError, KeyError):
+            columns = None
+        with self._lock:
+            if columns is None or any(len(values) != n_rows for values in columns.values()):
+                self._stats.misses += 1
+                return None
+            self._stats.hits += 1
+        # the access time of an entry is its modification time, used by eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return columns
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Cache feature columns and evict the least recently used entries over the budget.
+
+        Args:
+            key (str): key of the features
+            df (pd.DataFrame): feature columns, with the index of the source data
+        """
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._storage.write(df, self._path(key))
+        with self._lock:
+            self._evict()
+
+    def clear(self) -> None:
+        """
+        Remove all entries. Counters are kept.
+        """
+        with self._lock:
+            for path in self._entry_paths():
+                self._storage.remove(path)
+            self._stats.entries = 0
+            self._stats.bytes = 0
+
+    def stats(self) -> FeatureCacheStats:
+        """
+        Get a snapshot of the cache counters.
+
+        Return:
+            FeatureCacheStats: hits, misses, evictions, number of entries and their size in bytes
+        """
+        with self._lock:
+            entries = [_disk_size(path) for path in self._entry_paths()]
+            self._stats.entries = len(entries)
+            self._stats.bytes = sum(entries)
+            return FeatureCacheStats(**{name: getattr(self._stats, name) for name in FeatureCacheStats.__slots__})
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / f"{key}{self._storage.suffix}"
+
+    def _entry_paths(self) -> list[Path]:
+        if not self.base_dir.is_dir():
+            return []
+        return [path for path in self.base_dir.glob(f"*{self._storage.suffix}") if ".tmp-" not in path.name]
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries over the budget. Must be called with the lock held.
+        """
+        entries = []
+        for path in self._entry_paths():
+            try:
+                entries.append((path.stat().st_mtime_ns, _disk_size(path), path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and total > self.max_bytes:
+            _, size, path = entries.pop(0)
+            self._storage.remove(path)
+            total -= size
+            self._stats.evictions += 1
+        self._stats.entries = len(entries)
+        self._stats.bytes = total
+
+
+def fingerprint(df: pd.DataFrame, columns: list[str], *, checksums: bool = True) -> str:
+    """
+    Compute a cheap fingerprint of the index and given columns of data.
+
+    Hashing every value costs more than computing most features, so only the length, dtypes, evenly spaced sample
+    rows and the last rows (where refreshed data differs) are hashed, optionally together with a checksum of every
+    array: the wrapping sum of its values read as unsigned integers, one fast pass which changes with any single
+    changed value.
+
+    Args:
+        df (pd.DataFrame): data
+        columns (list[str]): columns to include
+        checksums (bool): if true, include checksums of the arrays. Default is true.
+
+    Return:
+        str: hex digest
+    """
+    h = blake2b(digest_size=20)
+    n = len(df)
+    rows = np.unique(np.concatenate([np.linspace(0, n - 1, min(n, SAMPLE_ROWS), dtype=np.int64),
+                                     np.arange(max(0, n - TAIL_ROWS), n)]))
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        h.update(f"{n}:{index.unit}:{index.tz}".encode())
+        _update(h, index.asi8, rows, checksums)
+    else:
+        h.update(f"{n}".encode())
+        h.update(pd.util.hash_pandas_object(index[rows], index=False).to_numpy().data)
+    for col in dict.fromkeys(columns):
+        values = df[col].to_numpy()
+        h.update(f"{col}:{values.dtype}".encode())
+        if values.dtype.kind in "biufcmM":
+            _update(h, values, rows, checksums)
+        else:
+            h.update(pd.util.hash_array(values[rows]).data)
+    return h.hexdigest()
+
+
+def _update(h, values: np.ndarray, rows: np.ndarray, checksums: bool) -> None:
+    """
+    Hash sample rows and the checksum of a numeric array (see fingerprint).
+    """
+    h.update(np.ascontiguousarray(values[rows]).data)
+    if not checksums:
+        return
+    words = np.ascontiguousarray(values)
+    if words.dtype.itemsize in (1, 2, 4, 8):
+        words = words.view(f"u{words.dtype.itemsize}")
+        h.update(np.add.reduce(words, dtype=np.uint64).tobytes())
+    else:
+        h.update(np.ascontiguousarray(values).data)
+
+
+def _disk_size(path: Path) -> int:
+    """
+    Get the size of a cache file (or of all files of a memmap directory).
+    """
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir())
+    return path.stat().st_size
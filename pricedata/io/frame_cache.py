@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import threading
+
+import pandas as pd
+
+
+@dataclass(slots=True)
+class FrameCacheStats:
+    """
+    Counters of the frame cache.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FrameCache:
+    """
+    Thread-safe, in-memory LRU cache of loaded frames with a memory budget.
+
+    Entries are keyed by the cache file path (which identifies symbol, interval, number of bars and storage format)
+    and are valid as long as the file modification time and size do not change. The least recently used entries are
+    evicted to keep the total size under max_bytes.
+
+    Callers get shallow copies of the cached frames: adding, removing or reassigning columns never affects the cache,
+    and with pandas copy-on-write (always on since pandas 3.0) neither does writing to values. Without copy-on-write
+    (pandas 2 with mode.copy_on_write off) callers get deep copies, so in-place writes can not reach the cache.
+    """
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2):
+        """
+        Setting initialize parameters.
+
+        Args:
+            max_bytes (int): memory budget in bytes. Default is 512 MiB.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Path, tuple[tuple[int, int], pd.DataFrame, int]] = OrderedDict()
+        self._stats = FrameCacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> pd.DataFrame | None:
+        """
+        Get a cached frame of a given file.
+
+        Args:
+            path (Path): path to the cache file
+
+        Return:
+            pd.DataFrame | None: copy of the cached frame (shallow with copy-on-write), None if there is no valid entry
+        """
+        signature = _signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._remove(path)
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self._stats.hits += 1
+            return entry[1].copy(deep=not _copy_on_write())
+
+    def put(self, path: Path, df: pd.DataFrame) -> None:
+        """
+        Cache a frame of a given file. Frames larger than the whole budget are not cached.
+
+        Args:
+            path (Path): path to the cache file
+            df (pd.DataFrame): data read from the file
+        """
+        signature = _signature(path)
+        if signature is None:
+            return
+        size = int(df.memory_usage(index=True, deep=False).sum())
+        with self._lock:
+            self._remove(path)
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (signature, df.copy(deep=False), size)
+            self._stats.bytes += size
+            while self._stats.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+            self._stats.entries = len(self._entries)
+
+    def clear(self) -> None:
+        """
+        Remove all entries. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stats.bytes = 0
+            self._stats.entries = 0
+
+    def stats(self) -> FrameCacheStats:
+        """
+        Get a snapshot of the cache counters.
+
+        Return:
+            FrameCacheStats: hits, misses, evictions, number of entries and their size in bytes
+        """
+        with self._lock:
+            return FrameCacheStats(**{name: getattr(self._stats, name) for name in FrameCacheStats.__slots__})
+
+    def _remove(self, path: Path) -> None:
+        """
+        Remove an entry (if any). Must be called with the lock held.
+        """
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._stats.bytes -= entry[2]
+        self._stats.entries = len(self._entries)
+
+
+def _copy_on_write() -> bool:
+    """
+    Check whether pandas copy-on-write is on (always since pandas 3.0, opt-in in pandas 2).
+    """
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    """
+    Get the modification time and size of a cache file (or of meta.json of a memmap directory).
+    """
+    if path.is_dir():
+        path = path / "meta.json"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# frame cache shared by every DataLoader in the process (unless another one is given)
+FRAME_CACHE = FrameCache()
@@ -1,43 +1,101 @@
-from dataclasses import dataclass
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+import math
+import re
+import threading
 import time
 
 import pandas as pd
 
-try:
-    from tvDatafeed import TvDatafeed, Interval
-except ModuleNotFoundError as e:
-    # even if TvDatafeed is not installed, you can still ise reading data from a csv file
-    TvDatafeed = object
-
-
-    @dataclass(slots=True)
-    class Interval:
-        in_1_min = "1"
-        in_3_min = "3"
-        in_5_min = "5"
-        in_15_min = "15"
-        in_30_min = "30"
-        in_45_min = "45"
-        in_1_hour = "60"
-        in_2_hour = "120"
-        in_3_hour = "180"
-        in_4_hour = "240"
-        in_daily = "1D"
-        in_weekly = "1W"
-        in_monthly = "1M"
+from pricedata.io.catalog import CacheCatalog, CatalogEntry
+from pricedata.io.frame_cache import FrameCache, FRAME_CACHE, _signature
+from pricedata.io.rate_limit import RateLimiter
+from pricedata.io.storage import Storage, CsvStorage, STORAGES, get_storage, get_storage_format
+from pricedata.transforms.resample import resample_ohlcv
+from pricedata.utils.intervals import interval_timedelta, is_monthly, parse_interval
+from pricedata.utils.profiling import Profiler, span
+
+if TYPE_CHECKING:
+    from tvDatafeed import TvDatafeed
+
+
+# the same names and values as tvDatafeed.Interval, used if tvDatafeed is not installed
+@dataclass(slots=True)
+class _Interval:
+    in_1_minute = "1"
+    in_3_minute = "3"
+    in_5_minute = "5"
+    in_15_minute = "15"
+    in_30_minute = "30"
+    in_45_minute = "45"
+    in_1_hour = "1H"
+    in_2_hour = "2H"
+    in_3_hour = "3H"
+    in_4_hour = "4H"
+    in_daily = "1D"
+    in_weekly = "1W"
+    in_monthly = "1M"
+
+
+@cache
+def _tvdatafeed() -> tuple[type, type]:
+    """
+    Import tvDatafeed (and its websocket stack) on the first use: only loaders which fetch data need it.
+
+    Return:
+        tuple[type, type]: TvDatafeed and Interval (object and the built-in _Interval if tvDatafeed is not installed)
+    """
+    try:
+        from tvDatafeed import TvDatafeed, Interval
+    except ModuleNotFoundError:
+        # even if TvDatafeed is not installed, you can still use reading data from a cache file
+        return object, _Interval
+    return TvDatafeed, Interval
+
+
+def __getattr__(name: str):
+    # TvDatafeed and Interval of this module are imported lazily (see _tvdatafeed)
+    if name in ("TvDatafeed", "Interval"):
+        return _tvdatafeed()[name == "Interval"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# dtypes of the compact mode (see DataConfig.compact)
+COMPACT_DTYPES = {
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "volume": "float32",
+    "symbol": "category",
+}
+
+# default number of attempts to fetch data and the initial delay (in seconds) between them, doubled after every
+# attempt (see DataLoader.fetch_attempts and DataLoader.fetch_delay)
+FETCH_ATTEMPTS = 4
+FETCH_DELAY = 1.0
 
 
 @dataclass(slots=True)
 class DataConfig:
     """
     Data configuration settings.
+
+    With compact=True, loaded frames hold float32 prices and volume and a categorical symbol column (about half of
+    the memory). Cache files keep the full precision.
     """
     symbol: str
     interval: str
     n_bars: int
     base_dir: Path
     index_name: str = "Date"
+    storage_format: str = "csv"
+    resample: bool = True
+    compact: bool = False
 
 
 @dataclass(slots=True)
@@ -49,12 +107,51 @@ class ClientConfig:
     password: str | None = None
 
 
+@dataclass(slots=True)
+class LoadResult:
+    """
+    Result of loading a single configuration in DataLoader.load_many.
+    """
+    cfg: DataConfig
+    df: pd.DataFrame | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 @dataclass(slots=True)
 class DataLoader:
     """
     The data loader class.
+
+    Optionally, a rate limiter (token bucket) can be shared by every request to TradingView, e.g.:
+    DataLoader(rate_limiter=RateLimiter(rate=2.0, capacity=5))
+
+    Every written cache file is recorded in the catalog (manifest) of base_dir, which is then used to find cached
+    data without walking the directory tree. When the first save creates the manifest, files cached before are
+    recorded in it as well. Use DataLoader(use_catalog=False) to disable it.
+
+    Loaded frames are kept in a process-wide LRU frame cache, so loading the same cache file again does not read
+    and normalize it. Use DataLoader(frame_cache=FrameCache(max_bytes=...)) for a separate cache or
+    DataLoader(frame_cache=None) to disable it.
+
+    The client may be any object with the get_hist interface of TvDatafeed, e.g. FakeTvClient (from
+    pricedata.io.fake_client) for offline and load tests. Failed fetches are retried fetch_attempts times, with
+    a delay of fetch_delay seconds doubled after every attempt.
+
+    Pass a profiler (DataLoader(profiler=Profiler(sink, ...))) to get timing events of every stage: load_or_fetch,
+    cache hit and miss, read, normalize, resample, fetch with every attempt, rate limit wait and backoff, and save.
     """
-    client: TvDatafeed | None = None
+    client: "TvDatafeed | None" = None
+    rate_limiter: RateLimiter | None = None
+    frame_cache: FrameCache | None = field(default_factory=lambda: FRAME_CACHE)
+    use_catalog: bool = True
+    profiler: Profiler | None = None
+    fetch_attempts: int = FETCH_ATTEMPTS
+    fetch_delay: float = FETCH_DELAY
+    _client_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
     @staticmethod
     def _csv_path(cfg: DataConfig) -> Path:
@@ -71,6 +168,21 @@ class DataLoader:
         sym = cfg.symbol.replace(":", "_")
         return (cfg.base_dir / sym / f"{cfg.interval}_{cfg.n_bars}.csv").resolve()
 
+    @staticmethod
+    def _cache_path(cfg: DataConfig) -> Path:
+        """
+        Create a path for saving data into a cache file of the configured storage format.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            Path: the path to cache file
+        """
+        sym = cfg.symbol.replace(":", "_")
+        suffix = get_storage(cfg.storage_format).suffix
+        return (cfg.base_dir / sym / f"{cfg.interval}_{cfg.n_bars}{suffix}").resolve()
+
     def load_or_fetch(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
         """
         Load data from given path or fetch data from TradingView via TvDatafeed.
@@ -83,23 +195,494 @@ class DataLoader:
             pd.DataFrame: OHLCV standard japanese candlestick price data.
 
         """
-        p = self._csv_path(cfg)
-        if p.exists():
-            df = pd.read_csv(p, parse_dates=[cfg.index_name])
-            df = df.set_index(cfg.index_name)
-            df.index.name = cfg.index_name
-            return self._normalize_df(df)
+        with span(self.profiler, "load_or_fetch", "loader", symbol=cfg.symbol, interval=cfg.interval) as event:
+            df = self._load_or_fetch(cfg, client_cfg)
+            if cfg.compact:
+                df = self._compact_df(df)
+            if event is not None:
+                event.record(df)
+        return df
+
+    def _load_or_fetch(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Load or fetch data in the full precision (see load_or_fetch).
+        """
+        df = self._load_cached(cfg)
+        if df is not None:
+            return df
 
         # if a given path does not exist, then fetch data from trading view and save into a given path
+        p = self._cache_path(cfg)
+        self._instant("cache miss", path=p)
         df = self._fetch_from_tv(cfg, client_cfg)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(p, index=True, index_label=cfg.index_name)
+        self._write(get_storage(cfg.storage_format), df, p, cfg)
         return df
 
+    def _load_cached(self, cfg: DataConfig) -> pd.DataFrame | None:
+        """
+        Load data from the cache, without fetching: the cache file of the configuration, a cached superset of bars or
+        bars resampled from a cached finer interval, in this order.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            pd.DataFrame | None: the cached data in the full precision, None if it is not cached
+        """
+        storage = get_storage(cfg.storage_format)
+        p = self._cache_path(cfg)
+        if p.exists():
+            self._instant("cache hit", source="file", path=p)
+            return self._read(storage, p, cfg)
+
+        # a cached superset of bars can answer a smaller request
+        superset = self._find_cached(cfg, min_bars=cfg.n_bars)
+        if superset is not None:
+            self._instant("cache hit", source="superset", path=superset)
+            return self._read(storage, superset, cfg).iloc[-cfg.n_bars:]
+
+        # bars of a higher interval can be built from cached bars of a finer interval
+        if cfg.resample:
+            with span(self.profiler, "resample", "loader", interval=cfg.interval) as event:
+                df = self._resample_from_finer(cfg)
+                if event is not None and df is not None:
+                    event.record(df)
+            if df is not None:
+                self._instant("cache hit", source="resample")
+                return df
+        return None
+
+    def cache_identity(self, cfg: DataConfig) -> str | None:
+        """
+        Get a cheap identity of the data which load_or_fetch returns from a cache file: the path, modification time
+        and size of the file (the same one load_or_fetch reads), the number of bars and the precision.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            str | None: the identity, None if the data is not cached in a file (e.g. it is resampled)
+        """
+        p = self._cache_path(cfg)
+        if not p.exists():
+            p = self._find_cached(cfg, min_bars=cfg.n_bars)
+        signature = _signature(p) if p is not None else None
+        if signature is None:
+            return None
+        return f"{p}:{signature[0]}:{signature[1]}:{cfg.n_bars}:{cfg.compact}"
+
+    def iter_chunks(self, cfg: DataConfig, client_cfg: ClientConfig, *,
+                    chunk_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Load data in normalized, time-ordered chunks of at most chunk_rows rows.
+
+        The peak memory is bounded by the chunk size for csv, parquet and memmap storages. If the data is not cached
+        yet, it is fetched and cached first (or resampled from a finer interval, then it is chunked in memory). Bars
+        repeated across chunk boundaries are dropped, so the chunks concatenated are equal to the data returned by
+        load_or_fetch.
+
+        Stateful transforms can be applied chunk by chunk by passing the same state dictionary for every chunk, e.g.:
+        state = {}
+        for chunk in loader.iter_chunks(cfg, client_cfg):
+            chunk = to_heikin_ashi(chunk, append=True, state=state)
+
+        Args:
+            cfg (DataConfig): data configuration setting
+            client_cfg (ClientConfig): client configuration settings
+            chunk_rows (int): maximal number of rows in a chunk. Default is 100 000.
+
+        Return:
+            Iterator[pd.DataFrame]: chunks of data
+        """
+        storage = get_storage(cfg.storage_format)
+        p = self._cache_path(cfg)
+        if not p.exists():
+            p = self._find_cached(cfg, min_bars=cfg.n_bars)
+        if p is None:
+            df = self._load_or_fetch(cfg, client_cfg)
+            p = self._cache_path(cfg)
+            if not p.exists():
+                # bars resampled from a finer interval are not cached, so they are chunked in memory
+                p = None
+
+        if p is None:
+            chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+            normalized = True
+        else:
+            # the number of cached bars is a part of the file name
+            n_cached = int(p.name[len(cfg.interval) + 1:-len(storage.suffix)])
+            chunks = storage.iter_chunks(p, cfg.index_name, chunk_rows, skip_rows=max(0, n_cached - cfg.n_bars))
+            normalized = storage.normalized
+
+        last: pd.Timestamp | None = None
+        for chunk in chunks:
+            if not normalized:
+                chunk = self._normalize_df(chunk, index_name=cfg.index_name, inplace=True)
+            if cfg.compact:
+                chunk = self._compact_df(chunk)
+            if last is not None:
+                chunk = chunk[chunk.index > last]
+            if chunk.empty:
+                continue
+            last = chunk.index[-1]
+            yield chunk
+
+    def load_many(self, configs: list[DataConfig], client_cfg: ClientConfig, *, max_workers: int = 8,
+                  refresh: bool = False) -> dict[tuple[str, str], LoadResult]:
+        """
+        Load or fetch many configurations concurrently in a bounded thread pool.
+
+        Cache reads and fetches run in up to max_workers threads which share one client. Use rate_limiter to keep
+        the total request rate under the upstream limits. An error of one configuration does not stop the others,
+        it is returned in its LoadResult. Results are keyed by (symbol, interval), so configurations with the same
+        symbol and interval (e.g. differing in n_bars) raise ValueError.
+
+        Args:
+            configs (list[DataConfig]): data configuration settings to load
+            client_cfg (ClientConfig): client configuration settings
+            max_workers (int): maximal number of concurrent loads. Default is 8.
+            refresh (bool): if true, top up existing caches (see refresh). Default is false.
+
+        Return:
+            dict[tuple[str, str], LoadResult]: results keyed by (symbol, interval), in the order of configs
+        """
+        _check_unique_keys(configs)
+        load = self.refresh if refresh else self.load_or_fetch
+
+        def run(cfg: DataConfig) -> LoadResult:
+            try:
+                return LoadResult(cfg, df=load(cfg, client_cfg))
+            except Exception as expectation:
+                return LoadResult(cfg, error=expectation)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run, configs))
+        return {(r.cfg.symbol, r.cfg.interval): r for r in results}
+
+    def refresh(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Extend the cached data with bars which appeared after the last cached timestamp.
+
+        Only the missing bars (plus the last cached one, which may have been still forming) are fetched. They are
+        merged with the cache according to the same rules as in normalization (the newest bar wins, index sorted).
+        The merged data replaces the previous cache file, whose name is updated with the new number of bars.
+        If nothing is cached yet, this is equivalent to load_or_fetch. If even a larger request does not reach back
+        to the last cached bar, RuntimeError is raised and the cache file is left unchanged.
+
+        Args:
+            cfg (DataConfig): data configuration setting
+            client_cfg (ClientConfig): client configuration settings
+
+        Return:
+            pd.DataFrame: the last n_bars of the refreshed data
+        """
+        storage = get_storage(cfg.storage_format)
+        cached_path = self._find_cached(cfg)
+        if cached_path is None:
+            return self.load_or_fetch(cfg, client_cfg)
+
+        with span(self.profiler, "refresh", "loader", symbol=cfg.symbol, interval=cfg.interval) as event:
+            merged = self._refresh(storage, cached_path, cfg, client_cfg)
+            if event is not None:
+                event.record(merged)
+        return merged
+
+    def _refresh(self, storage: Storage, cached_path: Path, cfg: DataConfig,
+                 client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Extend the cache file at cached_path (see refresh).
+        """
+        cached = self._read(storage, cached_path, cfg)
+        if cached.empty:
+            fresh = self._fetch_from_tv(cfg, client_cfg)
+        else:
+            missing = self._bars_since(cached.index[-1], cfg.interval)
+            fresh = self._fetch_from_tv(replace(cfg, n_bars=missing), client_cfg)
+            if fresh.index[0] > cached.index[-1]:
+                # fetched bars do not overlap the cache, so fill the gap with a larger request
+                fresh = self._fetch_from_tv(replace(cfg, n_bars=missing + len(cached)), client_cfg)
+            if fresh.index[0] > cached.index[-1]:
+                # e.g. upstream caps the number of bars; merging would leave a gap in the middle of the cache
+                raise RuntimeError(
+                    f"Fetched bars of {cfg.symbol} @ {cfg.interval} start at {fresh.index[0]}, after the last cached "
+                    f"bar at {cached.index[-1]}. The cache {cached_path} is left unchanged, load it again instead."
+                )
+
+        merged = self._normalize(pd.concat([cached, fresh]), cfg)
+        merged_path = self._cache_path(replace(cfg, n_bars=len(merged)))
+        self._write(storage, merged, merged_path, cfg)
+        if merged_path != cached_path:
+            storage.remove(cached_path)
+            if self.use_catalog:
+                CacheCatalog(cfg.base_dir).remove(cached_path)
+        merged = merged.iloc[-cfg.n_bars:]
+        return self._compact_df(merged) if cfg.compact else merged
+
     def save(self, df: pd.DataFrame, cfg: DataConfig) -> None:
-        p = self._csv_path(cfg)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(p, index=True, index_label=cfg.index_name)
+        """
+        Save data into a cache file of the configured storage format.
+
+        Args:
+            df (pd.DataFrame): data to save
+            cfg (DataConfig): data configuration settings
+        """
+        self._write(get_storage(cfg.storage_format), df, self._cache_path(cfg), cfg)
+
+    def migrate_cache(self, base_dir: Path, storage_format: str, *, index_name: str = "Date",
+                      remove_csv: bool = False) -> list[Path]:
+        """
+        Convert every csv cache file in base_dir into a given storage format.
+
+        Files which already exist in the target format are skipped.
+
+        Args:
+            base_dir (Path): directory with cached data (the same as DataConfig.base_dir)
+            storage_format (str): target storage format, e.g. "parquet", "feather", "npz"
+            index_name (str): name of the index column in csv files. Default is "Date"
+            remove_csv (bool): if true, remove csv files after conversion. Default is false.
+
+        Return:
+            list[Path]: paths of the created files
+        """
+        storage = get_storage(storage_format)
+        csv_storage = CsvStorage()
+        created = []
+        for csv_path in sorted(Path(base_dir).glob(f"*/*{csv_storage.suffix}")):
+            target = csv_path.with_suffix(storage.suffix)
+            if target == csv_path:
+                continue
+            if not target.exists():
+                df = self._normalize_df(csv_storage.read(csv_path, index_name), index_name=index_name, inplace=True)
+                storage.write(df, target, index_name)
+                created.append(target)
+            if remove_csv:
+                csv_path.unlink()
+
+        if self.use_catalog:
+            self.rebuild_catalog(base_dir, index_name=index_name)
+        return created
+
+    def rebuild_catalog(self, base_dir: Path, *, index_name: str = "Date") -> CacheCatalog:
+        """
+        Record every cache file in base_dir (of every storage format) in a new catalog.
+
+        Use it after files were added or removed by hand. Files cached before the catalog existed are recorded when
+        the first save creates it.
+
+        Args:
+            base_dir (Path): directory with cached data (the same as DataConfig.base_dir)
+            index_name (str): name of the index column in csv files. Default is "Date"
+
+        Return:
+            CacheCatalog: the rebuilt catalog
+        """
+        catalog = CacheCatalog(base_dir)
+        catalog.reset(self._scan_catalog(catalog, index_name=index_name))
+        return catalog
+
+    def _scan_catalog(self, catalog: CacheCatalog, *, index_name: str = "Date",
+                      skip_unreadable: bool = False) -> list[CatalogEntry]:
+        """
+        Describe every cache file under the base_dir of a catalog (see rebuild_catalog).
+
+        Args:
+            catalog (CacheCatalog): catalog of base_dir
+            index_name (str): name of the index column in csv files. Default is "Date"
+            skip_unreadable (bool): if true, skip files which can not be read (e.g. being written), otherwise raise.
+                        Default is false.
+
+        Return:
+            list[CatalogEntry]: entries of the cache files
+        """
+        if not catalog.base_dir.is_dir():
+            return []
+        patterns = {
+            storage_format: re.compile(rf"(.+)_(\d+){re.escape(storage.suffix)}")
+            for storage_format, storage in STORAGES.items()
+        }
+        entries = []
+        for sym_dir in sorted(p for p in catalog.base_dir.iterdir() if p.is_dir()):
+            # symbol directory is named EXCHANGE_TICKER
+            symbol = sym_dir.name.replace("_", ":", 1)
+            for p in sorted(sym_dir.iterdir()):
+                for storage_format, pattern in patterns.items():
+                    match = pattern.fullmatch(p.name)
+                    if match:
+                        storage = STORAGES[storage_format]
+                        try:
+                            df = storage.read(p, index_name)
+                        except Exception:
+                            if skip_unreadable:
+                                break
+                            raise
+                        if not storage.normalized:
+                            df = self._normalize_df(df, index_name=index_name, inplace=True)
+                        entries.append(catalog.entry(p, df, symbol=symbol, interval=match.group(1),
+                                                     storage_format=storage_format))
+                        break
+        return entries
+
+    def _find_cached(self, cfg: DataConfig, min_bars: int = 0) -> Path | None:
+        """
+        Find a cache file of the same symbol, interval and storage format with at least min_bars bars.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+            min_bars (int): minimal number of cached bars. If 0, the largest cache file is returned. Default is 0.
+
+        Return:
+            Path | None: path to the smallest cache file with at least min_bars bars (or the largest one if min_bars
+            is 0), None if there is no such file
+        """
+        found = [
+            (n_bars, p) for interval, n_bars, p in self._cached_files(cfg)
+            if interval == cfg.interval and n_bars >= min_bars
+        ]
+        if not found:
+            return None
+
+        n_bars, p = min(found) if min_bars else max(found)
+        return p
+
+    def _cached_files(self, cfg: DataConfig) -> list[tuple[str, int, Path]]:
+        """
+        List cache files of the same symbol and storage format.
+
+        The catalog of base_dir is used if it exists, otherwise the symbol directory is scanned.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            list[tuple[str, int, Path]]: interval, number of bars and path of every cache file
+        """
+        storage = get_storage(cfg.storage_format)
+        catalog = CacheCatalog(cfg.base_dir)
+        if self.use_catalog and catalog.exists():
+            entries = catalog.find(cfg.symbol, storage_format=get_storage_format(cfg.storage_format))
+            return [(e.interval, e.n_bars, p) for e in entries if (p := catalog.resolve(e)).exists()]
+
+        sym_dir = cfg.base_dir / cfg.symbol.replace(":", "_")
+        if not sym_dir.is_dir():
+            return []
+
+        pattern = re.compile(rf"(.+)_(\d+){re.escape(storage.suffix)}")
+        files = []
+        for p in sym_dir.iterdir():
+            match = pattern.fullmatch(p.name)
+            if match:
+                files.append((match.group(1), int(match.group(2)), p.resolve()))
+        return files
+
+    def _resample_from_finer(self, cfg: DataConfig) -> pd.DataFrame | None:
+        """
+        Build bars of the configured interval from cached bars of a finer interval.
+
+        The coarsest finer interval which divides the configured one (a day for monthly bars) and covers at least
+        n_bars resampled bars is used. Buckets are aligned to UTC (see resample_ohlcv).
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            pd.DataFrame | None: the last n_bars resampled bars, None if no cached finer interval covers them
+        """
+        storage = get_storage(cfg.storage_format)
+        target = pd.Timedelta(days=1) if is_monthly(cfg.interval) else interval_timedelta(cfg.interval)
+        candidates = []
+        for interval, n_cached, p in self._cached_files(cfg):
+            if is_monthly(interval):
+                continue
+            try:
+                base = interval_timedelta(interval)
+            except ValueError:
+                continue
+            if base < target and target % base == pd.Timedelta(0):
+                candidates.append((base, n_cached, p))
+
+        # the coarsest interval needs the least work; for the same interval, the longest history
+        for base, n_cached, p in sorted(candidates, key=lambda c: (c[0], c[1]), reverse=True):
+            if n_cached * base < cfg.n_bars * interval_timedelta(cfg.interval):
+                continue
+            df = resample_ohlcv(self._read(storage, p, cfg), cfg.interval)
+            if len(df) >= cfg.n_bars:
+                return df.iloc[-cfg.n_bars:]
+        return None
+
+    @staticmethod
+    def _bars_since(last: pd.Timestamp, interval_str: str) -> int:
+        """
+        Estimate the number of bars from a given timestamp till now.
+
+        The estimate includes the bar at the given timestamp and is never smaller than the real number of bars, as
+        market closures only reduce it.
+
+        Args:
+            last (pd.Timestamp): timestamp of the last known bar
+            interval_str (str): bar interval, e.g. "1m", "1h", "1d"
+
+        Return:
+            int: number of bars to fetch
+        """
+        elapsed = pd.Timestamp.now(tz="UTC") - last
+        return max(1, math.ceil(elapsed / interval_timedelta(interval_str))) + 1
+
+    def _read(self, storage: Storage, path: Path, cfg: DataConfig) -> pd.DataFrame:
+        """
+        Read data from a cache file (or get it from the frame cache). Normalization is skipped for storages which
+        keep dtypes and the UTC index.
+
+        Args:
+            storage (Storage): storage backend
+            path (Path): path to the cache file
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            pd.DataFrame: the cached data
+        """
+        if self.frame_cache is not None:
+            df = self.frame_cache.get(path)
+            if df is not None:
+                self._instant("frame cache hit", path=path)
+                return df
+            self._instant("frame cache miss", path=path)
+
+        with span(self.profiler, "read", "loader", format=get_storage_format(cfg.storage_format), path=path) as event:
+            df = storage.read(path, cfg.index_name)
+            if event is not None:
+                event.record(df)
+        if not storage.normalized:
+            df = self._normalize(df, cfg)
+
+        if self.frame_cache is not None:
+            self.frame_cache.put(path, df)
+        return df
+
+    def _write(self, storage: Storage, df: pd.DataFrame, path: Path, cfg: DataConfig) -> None:
+        """
+        Write data into a cache file. Written data is recorded in the catalog and put into the frame cache (unless
+        the storage is zero-copy, then the next read maps the written file instead).
+
+        Args:
+            storage (Storage): storage backend
+            df (pd.DataFrame): data to write
+            path (Path): path to the cache file
+            cfg (DataConfig): data configuration settings
+        """
+        with span(self.profiler, "save", "loader", format=get_storage_format(cfg.storage_format), path=path) as event:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            storage.write(df, path, cfg.index_name)
+            if event is not None:
+                event.record(df)
+        if self.use_catalog:
+            catalog = CacheCatalog(cfg.base_dir)
+            if not catalog.exists():
+                # once the manifest exists, lookups only use it: record files cached before it first
+                catalog.seed(self._scan_catalog(catalog, index_name=cfg.index_name, skip_unreadable=True))
+            catalog.record(path, df, symbol=cfg.symbol, interval=cfg.interval,
+                           storage_format=get_storage_format(cfg.storage_format))
+        if self.frame_cache is not None and not storage.zero_copy:
+            self.frame_cache.put(path, df)
 
     def _fetch_from_tv(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
         """
@@ -111,50 +694,145 @@ class DataLoader:
         Return:
             pd.DataFrame: the OHLCV price data
         """
-        if self.client is None:
-            try:
-                self.client: TvDatafeed | object = TvDatafeed(
-                    username=client_cfg.user_name,
-                    password=client_cfg.password
-                )
-            except Exception as expectation:
-                raise RuntimeError(
-                    "Failed to create TvDatafeed client. "
-                    "Try to use TradingView account:"
-                    "client = Client(user_name=..., password=...)"
-                    "DataLoader(client=client)"
-                ) from expectation
+        with span(self.profiler, "fetch", "loader", symbol=cfg.symbol, interval=cfg.interval,
+                  n_bars=cfg.n_bars) as event:
+            df = self._fetch_with_retries(cfg, client_cfg)
+            if event is not None:
+                event.record(df)
+        return df
 
-        exchange, ticker = self._split_symbol(cfg.symbol)
-        tv_interval = self._map_interval(cfg.interval)
+    def _fetch_with_retries(self, cfg: DataConfig, client_cfg: ClientConfig) -> pd.DataFrame:
+        """
+        Download price data, with up to fetch_attempts attempts and exponential backoff between them (see
+        _fetch_from_tv).
+        """
+        client = self._get_client(client_cfg)
+        request = self._hist_request(cfg)
 
-        attempts = 4
-        delay = 1.0
+        delay = self.fetch_delay
         last_err: Exception | None = None
-        for i in range(attempts):
+        for i in range(self.fetch_attempts):
             try:
-                df = self.client.get_hist(
-                    symbol=ticker,
-                    exchange=exchange,
-                    interval=tv_interval,
-                    n_bars=cfg.n_bars,
-                    fut_contract=None,
-                    extended_session=False,
-                )
-                if df is None or len(df) == 0:
-                    raise RuntimeError("TradingView returned empty data. Please try again.")
-                df = self._normalize_df(df, index_name=cfg.index_name)
-                return df
+                with span(self.profiler, "fetch attempt", "loader", attempt=i + 1) as event:
+                    if self.rate_limiter is not None:
+                        with span(self.profiler, "rate limit wait", "loader"):
+                            self.rate_limiter.acquire()
+                    df = client.get_hist(**request)
+                    if event is not None and df is not None:
+                        event.record(df)
+                    return self._checked_hist(df, cfg)
             except Exception as expectation:
                 last_err = expectation
-                time.sleep(delay)
+                if i + 1 == self.fetch_attempts:
+                    break
+                with span(self.profiler, "backoff", "loader", delay=delay):
+                    time.sleep(delay)
                 delay *= 2
 
-        raise RuntimeError(
+        raise self._fetch_error(cfg, last_err)
+
+    def _hist_request(self, cfg: DataConfig) -> dict:
+        """
+        Create keyword arguments of the client get_hist call.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            dict: get_hist keyword arguments
+        """
+        exchange, ticker = self._split_symbol(cfg.symbol)
+        return dict(
+            symbol=ticker,
+            exchange=exchange,
+            interval=self._map_interval(cfg.interval),
+            n_bars=cfg.n_bars,
+            fut_contract=None,
+            extended_session=False,
+        )
+
+    def _checked_hist(self, df: pd.DataFrame | None, cfg: DataConfig) -> pd.DataFrame:
+        """
+        Check and normalize data returned by the client get_hist call.
+
+        Args:
+            df (pd.DataFrame | None): returned data
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            pd.DataFrame: normalized data
+        """
+        if df is None or len(df) == 0:
+            raise RuntimeError("TradingView returned empty data. Please try again.")
+        return self._normalize(df, cfg)
+
+    def _normalize(self, df: pd.DataFrame, cfg: DataConfig) -> pd.DataFrame:
+        """
+        Normalize data owned by the loader in place (see _normalize_df), as a profiled stage.
+
+        Args:
+            df (pd.DataFrame): read or downloaded data
+            cfg (DataConfig): data configuration settings
+
+        Return:
+            pd.DataFrame: normalized data
+        """
+        with span(self.profiler, "normalize", "loader") as event:
+            df = self._normalize_df(df, index_name=cfg.index_name, inplace=True)
+            if event is not None:
+                event.record(df)
+        return df
+
+    def _instant(self, name: str, **args) -> None:
+        """
+        Emit an instant event (e.g. a cache hit) to the profiler, if any.
+        """
+        if self.profiler is not None:
+            self.profiler.instant(name, "loader", **args)
+
+    def _fetch_error(self, cfg: DataConfig, last_err: Exception | None) -> RuntimeError:
+        """
+        Create the error raised after all fetch attempts failed.
+
+        Args:
+            cfg (DataConfig): data configuration settings
+            last_err (Exception | None): error of the last attempt
+
+        Return:
+            RuntimeError: the error
+        """
+        return RuntimeError(
             f"Failed to retrieve data from TradingView for {cfg.symbol} @ {cfg.interval} "
-            f"after {attempts} attempts. Last error: {last_err}"
+            f"after {self.fetch_attempts} attempts. Last error: {last_err}"
         )
 
+    def _get_client(self, client_cfg: ClientConfig) -> "TvDatafeed":
+        """
+        Get the client, create it on the first use. The client is shared by every thread of the loader.
+
+        Args:
+            client_cfg (ClientConfig): client configuration settings
+
+        Return:
+            TvDatafeed: the client
+        """
+        with self._client_lock:
+            if self.client is None:
+                try:
+                    tv_datafeed, _ = _tvdatafeed()
+                    self.client = tv_datafeed(
+                        username=client_cfg.user_name,
+                        password=client_cfg.password
+                    )
+                except Exception as expectation:
+                    raise RuntimeError(
+                        "Failed to create TvDatafeed client. "
+                        "Try to use TradingView account:"
+                        "client = Client(user_name=..., password=...)"
+                        "DataLoader(client=client)"
+                    ) from expectation
+            return self.client
+
     @staticmethod
     def _split_symbol(symbol: str) -> tuple[str, str]:
         """
@@ -179,38 +857,52 @@ class DataLoader:
     @staticmethod
     def _map_interval(interval_str: str):
         """
-        Map str interval into TvDatafeed.Interval.
+        Map str interval into TvDatafeed.Interval (see utils.intervals.parse_interval, e.g. "1m" is one minute and
+        "1M" is one month).
 
         """
-        s = interval_str.strip().lower()
+        _, Interval = _tvdatafeed()
         mapping = {
-            "1m": Interval.in_1_minute,
-            "3m": Interval.in_3_minute,
-            "5m": Interval.in_5_minute,
-            "15m": Interval.in_15_minute,
-            "30m": Interval.in_30_minute,
-            "45m": Interval.in_45_minute,
-            "1h": Interval.in_1_hour,
-            "2h": Interval.in_2_hour,
-            "3h": Interval.in_3_hour,
-            "4h": Interval.in_4_hour,
-            "1d": Interval.in_daily,
-            "1w": Interval.in_weekly,
-            "1mth": Interval.in_monthly,
-            "1mon": Interval.in_monthly,
-            "1mo": Interval.in_monthly,
-            "1m_": Interval.in_monthly,
-            "1M": Interval.in_monthly,
+            (1, "m"): Interval.in_1_minute,
+            (3, "m"): Interval.in_3_minute,
+            (5, "m"): Interval.in_5_minute,
+            (15, "m"): Interval.in_15_minute,
+            (30, "m"): Interval.in_30_minute,
+            (45, "m"): Interval.in_45_minute,
+            (1, "h"): Interval.in_1_hour,
+            (2, "h"): Interval.in_2_hour,
+            (3, "h"): Interval.in_3_hour,
+            (4, "h"): Interval.in_4_hour,
+            (1, "d"): Interval.in_daily,
+            (1, "w"): Interval.in_weekly,
+            (1, "M"): Interval.in_monthly,
         }
-        if s in mapping:
-            return mapping[s]
-        alias = {"d": "1d", "w": "1w", "m": "1m"}
-        if s in alias and alias[s] in mapping:
-            return mapping[alias[s]]
-        raise ValueError(f"Unsupported interval: '{interval_str}'")
+        interval = mapping.get(parse_interval(interval_str))
+        if interval is None:
+            raise ValueError(f"Unsupported interval: '{interval_str}'")
+        return interval
 
     @staticmethod
-    def _normalize_df(df: pd.DataFrame, *, index_name: str = "Date") -> pd.DataFrame:
+    def _compact_df(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert prices and volume to float32 and the symbol to a categorical column (see DataConfig.compact).
+
+        Columns which already have the compact dtype are not copied.
+
+        Args:
+            df (pd.DataFrame): normalized data
+
+        Return:
+            Compact data.
+        """
+        changes = {
+            col: dtype for col, dtype in COMPACT_DTYPES.items()
+            if col in df.columns and df[col].dtype != dtype
+        }
+        return df.astype(changes) if changes else df
+
+    @staticmethod
+    def _normalize_df(df: pd.DataFrame, *, index_name: str = "Date", inplace: bool = False) -> pd.DataFrame:
         """
         Normalize data read from file or downloaded from TradingView.
 
@@ -220,14 +912,24 @@ class DataLoader:
         -> remove duplicated indexes
         -> sort indexes
 
+        Already normalized data (e.g. read from own cache) is returned as it is, without copying. Every step which
+        is not needed (e.g. sorting of a monotonic index) is skipped.
+
         Args:
             df (pd.DataFrame): read or downloaded data
             index_name (str): preferred index name. Default is "Date"
+            inplace (bool): if true, modify df instead of its copy. Use only if the caller owns df. Some steps
+                        (setting the index, removing duplicates, sorting) still create a new frame, so always use the
+                        returned one. Default is false (a shallow copy: no step writes values in place, so the
+                        columns of df are never copied nor modified).
 
         Return:
             Normalized data.
         """
-        df_copy = df.copy()
+        if DataLoader._is_normalized(df, index_name):
+            return df
+
+        df_copy = df if inplace else df.copy(deep=False)
 
         # make sure that index is of type pf.DatatimeIndex
         if not isinstance(df_copy.index, pd.DatetimeIndex):
@@ -243,14 +945,67 @@ class DataLoader:
         # force UTC and index name
         if df_copy.index.tz is None:
             df_copy.index = df_copy.index.tz_localize("UTC")
-        else:
+        elif not _is_utc(df_copy.index):
             df_copy.index = df_copy.index.tz_convert("UTC")
         df_copy.index.name = index_name
 
         # normalize columns names
-        df_copy.columns = [str(c).lower() for c in df_copy.columns]
+        if not _has_lowercase_columns(df_copy):
+            df_copy.columns = [str(c).lower() for c in df_copy.columns]
 
         # remove duplicated index and sort index
-        df_copy = df_copy[~df_copy.index.duplicated(keep="last")].sort_index()
+        if not df_copy.index.is_unique:
+            df_copy = df_copy[~df_copy.index.duplicated(keep="last")]
+        if not df_copy.index.is_monotonic_increasing:
+            df_copy = df_copy.sort_index()
 
         return df_copy
+
+    @staticmethod
+    def _is_normalized(df: pd.DataFrame, index_name: str = "Date") -> bool:
+        """
+        Check whether data is already normalized (see _normalize_df).
+
+        Args:
+            df (pd.DataFrame): data to check
+            index_name (str): preferred index name. Default is "Date"
+
+        Return:
+            bool: true if data is normalized
+        """
+        index = df.index
+        return (
+            isinstance(index, pd.DatetimeIndex)
+            and _is_utc(index)
+            and index.name == index_name
+            and _has_lowercase_columns(df)
+            and index.is_monotonic_increasing
+            and index.is_unique
+        )
+
+
+def _check_unique_keys(configs: list[DataConfig]) -> None:
+    """
+    Check that configurations loaded together have unique (symbol, interval) keys of their results.
+    """
+    seen = set()
+    for cfg in configs:
+        key = (cfg.symbol, cfg.interval)
+        if key in seen:
+            raise ValueError(f"More configurations of {key}: results are keyed by (symbol, interval), "
+                             f"load them separately.")
+        seen.add(key)
+
+
+def _is_utc(index: pd.DatetimeIndex) -> bool:
+    """
+    Check whether the index is localized to UTC.
+    """
+    return index.tz is not None and str(index.tz) == "UTC"
+
+
+def _has_lowercase_columns(df: pd.DataFrame) -> bool:
+    """
+    Check whether all columns names are lowercase strings.
+    """
+    return all(isinstance(c, str) and c == c.lower() for c in df.columns)
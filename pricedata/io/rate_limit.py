@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+import asyncio
+import threading
+import time
+
+
+@dataclass(slots=True)
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Tokens are refilled continuously at `rate` tokens per second up to `capacity`. Every request to the upstream
+    service takes one token, so the total request rate never exceeds `rate` (after an initial burst of `capacity`),
+    no matter how many threads share the limiter.
+    """
+    rate: float
+    capacity: float = 1.0
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.capacity < 1:
+            raise ValueError("RateLimiter requires rate > 0 and capacity >= 1.")
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Return:
+            float: 0.0 if the token was taken, otherwise the time in seconds until the next token is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """
+        Block until a token is available and take it.
+        """
+        while (wait := self.try_acquire()) > 0.0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """
+        Wait (without blocking the event loop) until a token is available and take it.
+        """
+        while (wait := self.try_acquire()) > 0.0:
+            await asyncio.sleep(wait)
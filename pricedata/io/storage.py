@@ -0,0 +1,386 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from pricedata.utils.dev_types.dev_types import StorageFormat, StorageFormatEnum
+
+
+@dataclass(slots=True, frozen=True)
+class Storage:
+    """
+    Base class of the cache storage backends.
+
+    Every backend writes a single file with the given suffix. Binary backends keep dtypes and the UTC DatetimeIndex,
+    so the data read from them is already normalized. Zero-copy backends build frames directly on the file buffers.
+    """
+    suffix: str = ""
+    normalized: bool = False
+    zero_copy: bool = False
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        """
+        Read data from a cache file.
+
+        Args:
+            path (Path): path to the cache file
+            index_name (str): name of the index column. Default is "Date"
+
+        Return:
+            pd.DataFrame: the cached data
+        """
+        raise NotImplementedError
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        """
+        Write data into a cache file.
+
+        Args:
+            df (pd.DataFrame): data to write
+            path (Path): path to the cache file
+            index_name (str): name of the index column. Default is "Date"
+        """
+        raise NotImplementedError
+
+    def iter_chunks(self, path: Path, index_name: str = "Date", chunk_rows: int = 100_000,
+                    skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Read data from a cache file in chunks of rows.
+
+        By default, the whole file is read and sliced. Backends which can read a part of the file override it, so the
+        peak memory is bounded by the chunk size.
+
+        Args:
+            path (Path): path to the cache file
+            index_name (str): name of the index column. Default is "Date"
+            chunk_rows (int): number of rows in a chunk. Default is 100 000.
+            skip_rows (int): number of leading rows to skip. Default is 0.
+
+        Return:
+            Iterator[pd.DataFrame]: chunks of the cached data
+        """
+        df = self.read(path, index_name)
+        for start in range(skip_rows, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+    def remove(self, path: Path) -> None:
+        """
+        Remove a cache file.
+
+        Args:
+            path (Path): path to the cache file
+        """
+        path.unlink(missing_ok=True)
+
+
+@dataclass(slots=True, frozen=True)
+class CsvStorage(Storage):
+    """
+    Plain text storage. Data read from csv must be normalized.
+    """
+    suffix: str = ".csv"
+    normalized: bool = False
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        df = pd.read_csv(path, parse_dates=[index_name])
+        df = df.set_index(index_name)
+        df.index.name = index_name
+        return df
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        df.to_csv(path, index=True, index_label=index_name)
+
+    def iter_chunks(self, path: Path, index_name: str = "Date", chunk_rows: int = 100_000,
+                    skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(path, parse_dates=[index_name], chunksize=chunk_rows,
+                         skiprows=range(1, skip_rows + 1)) as reader:
+            for chunk in reader:
+                chunk = chunk.set_index(index_name)
+                chunk.index.name = index_name
+                yield chunk
+
+
+@dataclass(slots=True, frozen=True)
+class ParquetStorage(Storage):
+    """
+    Columnar storage in Apache Parquet format. Requires pyarrow.
+    """
+    suffix: str = ".parquet"
+    normalized: bool = True
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        _require_pyarrow(StorageFormatEnum.PARQUET)
+        df = pd.read_parquet(path)
+        df.index.name = index_name
+        return df
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        _require_pyarrow(StorageFormatEnum.PARQUET)
+        df.to_parquet(path, index=True)
+
+    def iter_chunks(self, path: Path, index_name: str = "Date", chunk_rows: int = 100_000,
+                    skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+        _require_pyarrow(StorageFormatEnum.PARQUET)
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            chunk = batch.slice(skip_rows).to_pandas()
+            skip_rows = 0
+            chunk.index.name = index_name
+            yield chunk
+
+
+@dataclass(slots=True, frozen=True)
+class FeatherStorage(Storage):
+    """
+    Columnar storage in Feather (Arrow IPC) format. Requires pyarrow.
+    """
+    suffix: str = ".feather"
+    normalized: bool = True
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        _require_pyarrow(StorageFormatEnum.FEATHER)
+        df = pd.read_feather(path)
+        # feather does not store an index, so it is kept as the first column
+        df = df.set_index(df.columns[0])
+        df.index.name = index_name
+        return df
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        _require_pyarrow(StorageFormatEnum.FEATHER)
+        df.rename_axis(index_name).reset_index().to_feather(path)
+
+
+@dataclass(slots=True, frozen=True)
+class NpzStorage(Storage):
+    """
+    Columnar storage in numpy .npz format. Does not require any additional dependency.
+
+    The index is stored as int64 ticks since epoch (UTC) in its original unit, every column as a separate array.
+    """
+    suffix: str = ".npz"
+    normalized: bool = True
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["__meta__"]))
+            index = pd.DatetimeIndex(
+                npz["__index__"].view(f"datetime64[{meta['unit']}]"), name=index_name
+            ).tz_localize("UTC")
+            data = {
+                col: pd.Series(npz[f"col_{i}"], index=index, copy=False).astype(dtype, copy=False)
+                for i, (col, dtype) in enumerate(meta["dtypes"])
+            }
+        return pd.DataFrame(data, index=index)
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+        arrays = {"__index__": index.asi8}
+        dtypes = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            if series.dtype.kind in "biufcmM":
+                arrays[f"col_{i}"] = series.to_numpy()
+            else:
+                arrays[f"col_{i}"] = series.to_numpy(dtype=str)
+            dtypes.append((str(col), str(series.dtype)))
+        arrays["__meta__"] = np.array(json.dumps({"unit": index.unit, "dtypes": dtypes}))
+
+        # np.savez appends ".npz" to paths without it, so write through an opened file
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+
+@dataclass(slots=True, frozen=True)
+class MemmapStorage(Storage):
+    """
+    Directory of fixed-dtype column files opened through numpy.memmap.
+
+    Layout of the directory:
+    -> index.i8: timestamps as int64 ticks since epoch (UTC)
+    -> col_{i}.bin: every numeric column (prices as float64, volume) in its own dtype
+    -> meta.json: number of rows, index unit, columns, dtypes and constant columns (e.g. symbol)
+
+    The read DataFrame is built directly on the mapped buffers, so no data is copied and the OS page cache is shared
+    by every process which reads the same symbol. Columns are mapped copy-on-write (numpy.memmap mode "c"): the frame
+    is writable, a write copies only the touched pages into private memory and never reaches the file nor other
+    readers.
+    """
+    suffix: str = ".mmap"
+    normalized: bool = True
+    zero_copy: bool = True
+
+    def read(self, path: Path, index_name: str = "Date") -> pd.DataFrame:
+        meta = json.loads((path / "meta.json").read_text())
+        n_rows = meta["n_rows"]
+
+        ticks = _open_memmap(path / "index.i8", "int64", n_rows)
+        index = _utc_index(ticks, meta["unit"], index_name)
+
+        data = {}
+        for i, (col, dtype) in enumerate(meta["dtypes"]):
+            if col in meta["constants"]:
+                data[col] = pd.Series(meta["constants"][col], index=index, dtype=dtype)
+            else:
+                data[col] = _open_memmap(path / f"col_{i}.bin", dtype, n_rows)
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def read_columns(self, path: Path) -> dict[str, np.ndarray]:
+        """
+        Map the numeric columns without building a DataFrame.
+
+        Unlike the columns of the read frame (read-only views under pandas copy-on-write), the arrays are writable:
+        they are mapped copy-on-write, so a write never reaches the file.
+
+        Args:
+            path (Path): path to the directory
+
+        Return:
+            dict[str, np.ndarray]: arrays keyed by column name (constant columns are skipped)
+        """
+        meta = json.loads((path / "meta.json").read_text())
+        return {
+            col: _open_memmap(path / f"col_{i}.bin", dtype, meta["n_rows"])
+            for i, (col, dtype) in enumerate(meta["dtypes"]) if col not in meta["constants"]
+        }
+
+    def write(self, df: pd.DataFrame, path: Path, index_name: str = "Date") -> None:
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+        # write into a temporary directory and swap it in, so concurrent readers never see partial files
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        index.asi8.astype("int64", copy=False).tofile(tmp / "index.i8")
+        dtypes = []
+        constants = {}
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            dtypes.append((str(col), str(series.dtype)))
+            if series.dtype.kind in "biufc":
+                series.to_numpy().tofile(tmp / f"col_{i}.bin")
+            elif series.nunique(dropna=False) <= 1:
+                constants[str(col)] = None if series.empty else str(series.iloc[0])
+            else:
+                raise ValueError(
+                    f"Column '{col}' of dtype {series.dtype} can not be memory-mapped. "
+                    "Only numeric and constant columns are supported."
+                )
+
+        (tmp / "meta.json").write_text(json.dumps({
+            "n_rows": len(df),
+            "unit": index.unit,
+            "dtypes": dtypes,
+            "constants": constants,
+        }))
+
+        self.remove(path)
+        os.replace(tmp, path)
+
+    def remove(self, path: Path) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+STORAGES: dict[StorageFormatEnum, Storage] = {
+    StorageFormatEnum.CSV: CsvStorage(),
+    StorageFormatEnum.PARQUET: ParquetStorage(),
+    StorageFormatEnum.FEATHER: FeatherStorage(),
+    StorageFormatEnum.NPZ: NpzStorage(),
+    StorageFormatEnum.MEMMAP: MemmapStorage(),
+}
+
+
+def get_storage(storage_format: str | StorageFormatEnum) -> Storage:
+    """
+    Get the storage backend for a given format.
+
+    Args:
+        storage_format (str | StorageFormatEnum): format name or one of its aliases, e.g. "csv", "parquet", "npz"
+
+    Return:
+        Storage: the storage backend
+    """
+    return STORAGES[get_storage_format(storage_format)]
+
+
+def get_storage_format(storage_format: str | StorageFormatEnum) -> StorageFormatEnum:
+    """
+    Resolve a storage format name or alias.
+
+    Args:
+        storage_format (str | StorageFormatEnum): format name or one of its aliases, e.g. "csv", "pq", "mmap"
+
+    Return:
+        StorageFormatEnum: the storage format
+    """
+    if isinstance(storage_format, StorageFormatEnum):
+        return storage_format
+    return StorageFormat[storage_format]
+
+
+def _require_pyarrow(storage_format: StorageFormatEnum) -> None:
+    """
+    Make sure that pyarrow is installed.
+
+    Args:
+        storage_format (StorageFormatEnum): format which requires pyarrow
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ModuleNotFoundError as expectation:
+        raise RuntimeError(
+            f"Storage format '{storage_format}' requires pyarrow. "
+            "Install it with: pip install pyarrow "
+            "or use storage_format='npz'."
+        ) from expectation
+
+
+def _open_memmap(path: Path, dtype: str, n_rows: int) -> np.ndarray:
+    """
+    Open a column file as a copy-on-write array: writes go to private pages, the file is never modified.
+
+    Args:
+        path (Path): path to the column file
+        dtype (str): dtype of the column
+        n_rows (int): number of rows
+
+    Return:
+        np.ndarray: writable array backed by the mapped file
+    """
+    if n_rows == 0:
+        # numpy can not map an empty file
+        return np.empty(0, dtype=dtype)
+    return np.asarray(np.memmap(path, dtype=dtype, mode="c", shape=(n_rows,)))
+
+
+def _utc_index(ticks: np.ndarray, unit: str, index_name: str) -> pd.DatetimeIndex:
+    """
+    Build a UTC DatetimeIndex on int64 ticks without copying them.
+
+    Args:
+        ticks (np.ndarray): int64 ticks since epoch (UTC)
+        unit (str): unit of ticks, e.g. "ns", "us"
+        index_name (str): name of the index
+
+    Return:
+        pd.DatetimeIndex: the UTC index
+    """
+    values = ticks.view(f"datetime64[{unit}]")
+    try:
+        # tz_localize always copies, even for UTC; build the tz-aware array directly on the buffer instead
+        array = pd.arrays.DatetimeArray._simple_new(values, dtype=pd.DatetimeTZDtype(unit, "UTC"))
+        return pd.DatetimeIndex(array, name=index_name, copy=False)
+    except (AttributeError, TypeError):
+        return pd.DatetimeIndex(values, name=index_name).tz_localize("UTC")
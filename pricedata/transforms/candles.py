@@ -1,11 +1,17 @@
+import numpy as np
 import pandas as pd
-from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum
+from pricedata.transforms.kernels import heikin_ashi
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum, CandleKindEnum
+from pricedata.utils.memory import attach_columns
 
 
-def to_heikin_ashi(df: pd.DataFrame, append: bool) -> pd.DataFrame:
+def to_heikin_ashi(df: pd.DataFrame, append: bool, *, state: dict | None = None) -> pd.DataFrame:
     """
     Transform given candles to heikin ashi.
 
+    The candles are computed with the recursive definition, open_ha[i] = (open_ha[i-1] + close_ha[i-1]) / 2, in a
+    single pass over the price arrays (see transforms.kernels.heikin_ashi).
+
     NOTE.:
     The value of the heikin ashi candles depends on the initial candle. The values may vary depending on the number of
     candles loaded.
@@ -14,6 +20,9 @@ def to_heikin_ashi(df: pd.DataFrame, append: bool) -> pd.DataFrame:
         df (pd.DataFrame): data for which candles are transformed
         append (bool): if true, append new columns: ha_open, ha_high, ha_low, ha_close. Otherwise, rewrite open, high,
                         low, close. Default is true.
+        state (dict | None): carry state of consecutive chunks of data. Pass the same (initially empty) dictionary
+                        for every chunk, in time order, to get the same candles as for the whole data at once.
+                        Default is None.
     Return:
         Data with transformed candles.
 
@@ -25,21 +34,32 @@ def to_heikin_ashi(df: pd.DataFrame, append: bool) -> pd.DataFrame:
         print(f"Missing columns for HEIKIN ASHI: {sorted(missing)}. The kind of candles has not been changed.")
         return df
 
-    data_copy = df.copy()
-
-    # calculate ha candles
-    data_copy[ColumnTypeEnum.CLOSE_HA] = data_copy[ColumnTypeSetEnum.OHLC.value].sum(axis=1) / 4.0
-
-    data_copy[ColumnTypeEnum.OPEN_HA] = data_copy[ColumnTypeEnum.OPEN]
-    data_copy.loc[data_copy.index[1:], ColumnTypeEnum.OPEN_HA] = (
-                                            data_copy[ColumnTypeSetEnum.OC_HA.value].sum(axis=1).shift(1) / 2.0).iloc[1:]
-
-    data_copy[ColumnTypeEnum.HIGH_HA] = data_copy[
-        [ColumnTypeEnum.HIGH, *ColumnTypeSetEnum.OC_HA.value]].max(axis=1)
+    prev = state.get(CandleKindEnum.HA) if state is not None else None
+    open_ha, high_ha, low_ha, close_ha = heikin_ashi(
+        *(_float_array(df[col]) for col in ColumnTypeSetEnum.OHLC.value), prev=prev
+    )
+    if state is not None and len(df):
+        state[CandleKindEnum.HA] = (open_ha[-1], close_ha[-1])
 
-    data_copy[ColumnTypeEnum.LOW_HA] = data_copy[
-        [ColumnTypeEnum.LOW, *ColumnTypeSetEnum.OC_HA.value]].min(axis=1)
+    # shallow copy: new columns are attached without copying the existing ones (nor the computed candles)
+    data_copy = df.copy(deep=False)
+    attach_columns(data_copy, {
+        ColumnTypeEnum.CLOSE_HA: close_ha,
+        ColumnTypeEnum.OPEN_HA: open_ha,
+        ColumnTypeEnum.HIGH_HA: high_ha,
+        ColumnTypeEnum.LOW_HA: low_ha,
+    })
 
     if not append:
-        data_copy[ColumnTypeSetEnum.OHLC.value] = data_copy[ColumnTypeSetEnum.OHLC_HA.value]
+        # the rewritten columns share the values of the heikin ashi ones (copy-on-write keeps them apart)
+        for col, col_ha in zip(ColumnTypeSetEnum.OHLC.value, ColumnTypeSetEnum.OHLC_HA.value):
+            data_copy[col] = data_copy[col_ha]
     return data_copy
+
+
+def _float_array(series: pd.Series) -> np.ndarray:
+    """
+    Get values of a price column as a contiguous float array (float dtypes are kept, others become float64).
+    """
+    dtype = series.dtype if series.dtype.kind == "f" else np.float64
+    return np.ascontiguousarray(series.to_numpy(dtype=dtype))
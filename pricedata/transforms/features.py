@@ -1,7 +1,11 @@
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from pricedata.utils.dev_types.spec.spec import OHLCSpec, ReturnSpec
-from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum, CandleKindEnum
+from pricedata.transforms.kernels import weighted_sums, rolling_sums, exponential_smoothing, ratios
+from pricedata.utils.dev_types.spec.spec import OHLCSpec, ReturnSpec, IndicatorSpec
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum, ColumnTypeSetEnum, CandleKindEnum, DirectionEnum
+from pricedata.utils.memory import attach_columns
 
 
 handler = {
@@ -20,6 +24,20 @@ handler = {
 }
 
 
+def add_price_averages(df: pd.DataFrame, *, spec: OHLCSpec):
+    """
+    Add every price average column (OHLC4, HLC3, HLCC4, HL2) of the specification for every candle kind at once.
+
+    The needed price columns are read once, all averages are computed in a single vectorized pass and attached to df
+    in bulk.
+
+    Args:
+        df (pd.DataFrame): data from which price average columns are created
+        spec (OHLCSpec): specification
+    """
+    add_price_average_columns(df, [(ck, fk) for ck in spec.candle_kinds for fk in spec.feature_kinds])
+
+
 def add_ohlc4(df: pd.DataFrame, *, spec: OHLCSpec):
     """
     Add OHLC4 column.
@@ -28,10 +46,7 @@ def add_ohlc4(df: pd.DataFrame, *, spec: OHLCSpec):
         df (pd.DataFrame): data from which OHLC4 column is created
         spec (OHLCSpec): specification
     """
-    for candle_kind in spec.candle_kinds:
-        OHLC4, OHLC = handler[candle_kind][ColumnTypeEnum.OHLC4]
-
-        df[OHLC4] = df[OHLC].sum(axis=1) / len(OHLC)
+    add_price_average_columns(df, [(ck, ColumnTypeEnum.OHLC4) for ck in spec.candle_kinds])
 
 
 def add_hlc3(df: pd.DataFrame, *, spec: OHLCSpec):
@@ -42,10 +57,7 @@ def add_hlc3(df: pd.DataFrame, *, spec: OHLCSpec):
         df (pd.DataFrame): data from which HLC3 column is created
         spec (OHLCSpec): specification
     """
-    for candle_kind in spec.candle_kinds:
-        HLC3, HLC = handler[candle_kind][ColumnTypeEnum.HLC3]
-
-        df[HLC3] = df[HLC].sum(axis=1) / len(HLC)
+    add_price_average_columns(df, [(ck, ColumnTypeEnum.HLC3) for ck in spec.candle_kinds])
 
 
 def add_hlcc4(df: pd.DataFrame, *, spec: OHLCSpec):
@@ -56,10 +68,7 @@ def add_hlcc4(df: pd.DataFrame, *, spec: OHLCSpec):
         df (pd.DataFrame): data from which HLCC4 column is created
         spec (OHLCSpec): specification
     """
-    for candle_kind in spec.candle_kinds:
-        HLCC4, HLCC = handler[candle_kind][ColumnTypeEnum.HLCC4]
-
-        df[HLCC4] = df[HLCC].sum(axis=1) / len(HLCC)
+    add_price_average_columns(df, [(ck, ColumnTypeEnum.HLCC4) for ck in spec.candle_kinds])
 
 
 def add_hl2(df: pd.DataFrame, *, spec: OHLCSpec):
@@ -70,36 +79,492 @@ def add_hl2(df: pd.DataFrame, *, spec: OHLCSpec):
         df (pd.DataFrame): data from which HL2 column is created
         spec (OHLCSpec): specification
     """
-    for candle_kind in spec.candle_kinds:
-        HL2, HL = handler[candle_kind][ColumnTypeEnum.HL2]
+    add_price_average_columns(df, [(ck, ColumnTypeEnum.HL2) for ck in spec.candle_kinds])
+
+
+def add_price_average_columns(df: pd.DataFrame, targets: list[tuple[CandleKindEnum, ColumnTypeEnum]]):
+    """
+    Add price average columns of given (candle kind, average kind) pairs in a single pass.
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        targets (list[tuple[CandleKindEnum, ColumnTypeEnum]]): pairs of candle kind and average kind, e.g.
+                        (CandleKindEnum.HA, ColumnTypeEnum.HL2)
+    """
+    targets = [handler[ck][fk] for ck, fk in targets]
+    if not targets:
+        return
+    sources = list(dict.fromkeys(col for _, cols in targets for col in cols))
+
+    # weight of a source column in an average, e.g. close in HLCC4 is 2/4
+    weights = np.zeros((len(sources), len(targets)))
+    for j, (_, cols) in enumerate(targets):
+        for col in cols:
+            weights[sources.index(col), j] += 1.0 / len(cols)
+
+    out = weighted_sums([df[col].to_numpy() for col in sources], weights)
+    attach_columns(df, {name: row for (name, _), row in zip(targets, out)})
+
+
+RETURN_PREFIX = {
+    ColumnTypeEnum.RETURN: ColumnTypeEnum.RETURN_,
+    ColumnTypeEnum.LOG_RETURN: ColumnTypeEnum.LOG_RETURN_,
+}
+
+# marks forward returns in column names, e.g. return-fwd-5-close
+FORWARD_TAG = "fwd"
+
+
+def add_return(df: pd.DataFrame, *, spec: ReturnSpec, state: dict | None = None):
+    """
+    Add classical return columns of every source and horizon of the specification.
 
-        df[HL2] = df[HL].sum(axis=1) / len(HL)
+    Args:
+        df (pd.DataFrame): data from which return columns are created
+        spec (ReturnSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Pass the same (initially empty) dictionary
+                        for every chunk, in time order, to get the same returns as for the whole data at once.
+                        Default is None.
+    """
+    add_return_columns(df, return_targets(spec, [ColumnTypeEnum.RETURN]), state=state)
 
 
-def add_return(df: pd.DataFrame, *, spec: ReturnSpec):
+def add_log_return(df: pd.DataFrame, *, spec: ReturnSpec, state: dict | None = None):
     """
-    Add classical return column.
+    Add logarithmic return columns of every source and horizon of the specification.
 
     Args:
-        df (pd.DataFrame): data from which return column is created
-        spec (OHLCSpec): specification
+        df (pd.DataFrame): data from which logarithmic return columns are created
+        spec (ReturnSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Pass the same (initially empty) dictionary
+                        for every chunk, in time order, to get the same returns as for the whole data at once.
+                        Default is None.
     """
-    for src in spec.sources:
-        ret_col_name = ColumnTypeEnum.RETURN_ + src
-        series = df[src]
-        df[ret_col_name] = series.pct_change().fillna(0.0)
+    add_return_columns(df, return_targets(spec, [ColumnTypeEnum.LOG_RETURN]), state=state)
 
 
-def add_log_return(df: pd.DataFrame, *, spec: ReturnSpec):
+def return_targets(spec: ReturnSpec, feature_kinds: list[str] | None = None) -> list[tuple[str, str, int, str]]:
     """
-    Add logarithmic return column.
+    Get (return kind, source, horizon, direction) quadruples of a specification.
 
     Args:
-        df (pd.DataFrame): data from which logarithmic return column is created
-        spec (OHLCSpec): specification
+        spec (ReturnSpec): specification
+        feature_kinds (list[str] | None): kinds to compute. Default is None (every kind of the specification).
+
+    Return:
+        list[tuple[str, str, int, str]]: the quadruples
+    """
+    kinds = spec.feature_kinds if feature_kinds is None else feature_kinds
+    direction = DirectionEnum(spec.direction)
+    return list(dict.fromkeys(
+        (ColumnTypeEnum(kind), str(src), horizon, direction)
+        for kind in kinds for src in spec.sources for horizon in spec.horizons
+    ))
+
+
+@lru_cache(maxsize=4096)
+def return_name(kind: str, src: str, horizon: int = 1, direction: str = DirectionEnum.BACKWARD) -> str:
+    """
+    Get the column name of a return, e.g. return-close (one bar back), log-return-5-close, return-fwd-1-close.
+    """
+    prefix = RETURN_PREFIX[kind]
+    if direction == DirectionEnum.FORWARD:
+        return f"{prefix}{FORWARD_TAG}-{horizon}-{src}"
+    return f"{prefix}{src}" if horizon == 1 else f"{prefix}{horizon}-{src}"
+
+
+def add_return_columns(df: pd.DataFrame, targets: list[tuple[str, str, int, str]], *, state: dict | None = None):
+    """
+    Add return columns of given (return kind, source, horizon, direction) quadruples.
+
+    The sources are stacked into one (sources, bars) array and the returns of every source are computed together, in
+    one vectorized division per horizon (see return_block). Backward returns without a preceding bar are 0, forward
+    returns without a following bar are NaN.
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        targets (list[tuple[str, str, int, str]]): return quadruples, e.g. (ColumnTypeEnum.LOG_RETURN, "close", 5,
+                        DirectionEnum.BACKWARD)
+        state (dict | None): carry state of consecutive chunks of data (the last values of every source). Pass the
+                        same (initially empty) dictionary for every chunk, in time order, to get the same returns as
+                        for the whole data at once. Forward returns depend on later bars, so they can not be carried.
+                        Default is None.
+    """
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return
+    if state is not None and any(d == DirectionEnum.FORWARD for *_, d in targets):
+        raise ValueError("Forward returns depend on later bars, they can not be computed chunk by chunk.")
+
+    sources = list(dict.fromkeys(src for _, src, _, _ in targets))
+    # the last values of the preceding chunks go first (NaN if there are not enough)
+    past = max(h for _, _, h, _ in targets) if state is not None else 0
+    x = np.empty((len(sources), past + len(df)), dtype=np.result_type(*(df[src].dtype for src in sources), np.float32))
+    x[:, :past] = np.nan
+    for row, src in zip(x, sources):
+        tail = _return_tail(state, targets, src) if past else []
+        if len(tail):
+            row[past - len(tail[-past:]):past] = tail[-past:]
+        row[past:] = df[src].to_numpy()
+
+    out = return_block(x, targets, sources, offset=past)
+    attach_columns(df, {return_name(*target): row for target, row in zip(targets, out)})
+    if state is not None:
+        _store_return_tails(state, targets, {src: row for src, row in zip(sources, x)})
+
+
+def return_block(x: np.ndarray, targets: list[tuple[str, str, int, str]], sources: list[str], *, offset: int = 0,
+                 lengths: np.ndarray | None = None) -> np.ndarray:
+    """
+    Compute returns of stacked sources.
+
+    Args:
+        x (np.ndarray): (..., sources, offset + bars) values of the sources, the first offset values precede the bars
+        targets (list[tuple[str, str, int, str]]): return quadruples
+        sources (list[str]): sources, in the order of x
+        offset (int): number of preceding values. Default is 0.
+        lengths (np.ndarray | None): (...) number of existing bars of every series (the following ones are padding).
+                        Default is None (every bar exists).
+
+    Return:
+        np.ndarray: (..., targets, bars) returns, of the dtype of x (at least float32)
+    """
+    n = x.shape[-1] - offset
+    out = np.empty(x.shape[:-2] + (len(targets), n), dtype=np.result_type(x, np.float32))
+    groups: dict[tuple[int, str], list[int]] = {}
+    for j, (_, _, horizon, direction) in enumerate(targets):
+        groups.setdefault((horizon, direction), []).append(j)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for (horizon, direction), js in groups.items():
+            rows = list(dict.fromkeys(sources.index(targets[j][1]) for j in js))
+            # ratios of every source at once
+            ratio = ratios(x if rows == list(range(len(sources))) else x[..., rows, :], horizon,
+                           forward=direction == DirectionEnum.FORWARD, offset=offset)
+            for j in js:
+                r = ratio[..., rows.index(sources.index(targets[j][1])), :]
+                if targets[j][0] == ColumnTypeEnum.LOG_RETURN:
+                    np.log(r, out=out[..., j, :])
+                else:
+                    np.subtract(r, 1.0, out=out[..., j, :])
+
+    # missing (and invalid) returns are 0, as pct_change().fillna(0.0), except forward returns past the last bar
+    np.copyto(out, 0.0, where=np.isnan(out))
+    ends = n if lengths is None else np.asarray(lengths)[..., None]
+    for j, (_, _, horizon, direction) in enumerate(targets):
+        if direction == DirectionEnum.FORWARD:
+            row = out[..., j, :]
+            row[np.arange(n) >= ends - horizon] = np.nan
+    return out
+
+
+def return_state(df: pd.DataFrame, targets: list[tuple[str, str, int, str]], state: dict) -> None:
+    """
+    Set the carry state which add_return_columns leaves after df (e.g. when its returns were read from a cache).
+
+    Args:
+        df (pd.DataFrame): data with the sources of returns
+        targets (list[tuple[str, str, int, str]]): return quadruples
+        state (dict): carry state to set
+    """
+    sources = dict.fromkeys(src for _, src, _, _ in targets)
+    _store_return_tails(state, targets, {src: df[src].to_numpy() for src in sources})
+
+
+def _return_tail(state: dict, targets: list[tuple[str, str, int, str]], src: str) -> np.ndarray:
+    """
+    Get the longest carried tail of a source.
+    """
+    tails = [state.get(RETURN_PREFIX[kind] + src, []) for kind, _ in dict.fromkeys((t[0], t[1]) for t in targets)]
+    return max(tails, key=len, default=[])
+
+
+def _store_return_tails(state: dict, targets: list[tuple[str, str, int, str]], values: dict[str, np.ndarray]) -> None:
+    """
+    Keep the last values of every source (as many as its longest backward horizon), per return kind.
+    """
+    for kind, src, horizon, direction in targets:
+        if direction == DirectionEnum.BACKWARD:
+            key = RETURN_PREFIX[kind] + src
+            n_tail = max(horizon, len(state.get(key, [])))
+            state[key] = values[src][-n_tail:].copy()
+
+
+INDICATOR_PREFIX = {
+    ColumnTypeEnum.SMA: ColumnTypeEnum.SMA_,
+    ColumnTypeEnum.EMA: ColumnTypeEnum.EMA_,
+    ColumnTypeEnum.ATR: ColumnTypeEnum.ATR_,
+    ColumnTypeEnum.RSI: ColumnTypeEnum.RSI_,
+    ColumnTypeEnum.STD: ColumnTypeEnum.STD_,
+    ColumnTypeEnum.VOLATILITY: ColumnTypeEnum.VOLATILITY_,
+    ColumnTypeEnum.ZSCORE: ColumnTypeEnum.ZSCORE_,
+}
+
+# indicators computed from sums over windows, the others are recursive
+WINDOWED_INDICATORS = {ColumnTypeEnum.SMA, ColumnTypeEnum.STD, ColumnTypeEnum.VOLATILITY, ColumnTypeEnum.ZSCORE}
+
+
+def indicator_targets(spec: IndicatorSpec, feature_kinds: list[str] | None = None) -> list[tuple[str, int, str]]:
+    """
+    Get (indicator kind, window, source) triples of a specification. ATR is computed from high, low and close, so its
+    source is empty.
+
+    Args:
+        spec (IndicatorSpec): specification
+        feature_kinds (list[str] | None): kinds to include. Default is None (every kind of the specification).
+
+    Return:
+        list[tuple[str, int, str]]: the triples
     """
-    for src in spec.sources:
-        ret_col_name = ColumnTypeEnum.LOG_RETURN_ + src
-        series = df[src]
-        df[ret_col_name] = np.log(series / series.shift(1)).fillna(0.0)
+    targets = []
+    for kind in spec.feature_kinds:
+        if feature_kinds is not None and kind not in feature_kinds:
+            continue
+        for window in spec.windows:
+            sources = [""] if kind == ColumnTypeEnum.ATR else spec.sources
+            targets.extend((kind, window, str(src)) for src in sources)
+    return list(dict.fromkeys(targets))
+
+
+@lru_cache(maxsize=4096)
+def indicator_name(kind: str, window: int, src: str) -> str:
+    """
+    Get the column name of an indicator, e.g. sma-20-close, atr-14.
+    """
+    name = f"{INDICATOR_PREFIX[kind]}{window}"
+    return f"{name}-{src}" if src else name
+
+
+def indicator_sources(kind: str, src: str) -> list[str]:
+    """
+    Get the columns read by an indicator.
+    """
+    return list(ColumnTypeSetEnum.HLC.value) if kind == ColumnTypeEnum.ATR else [src]
+
+
+def add_sma(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add simple moving average columns, the mean over the last `window` values.
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.SMA]), state=state)
+
+
+def add_ema(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add exponential moving average columns, with smoothing factor 2 / (window + 1).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.EMA]), state=state)
+
+
+def add_atr(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add average true range columns (Wilder's smoothing of the true range, with factor 1 / window).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.ATR]), state=state)
+
+
+def add_rsi(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add relative strength index columns (Wilder's smoothing of gains and losses, with factor 1 / window).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.RSI]), state=state)
+
+
+def add_std(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add rolling standard deviation columns (sample standard deviation over the last `window` values).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.STD]), state=state)
+
+
+def add_volatility(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add rolling volatility columns (sample standard deviation of the last `window` logarithmic returns).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.VOLATILITY]), state=state)
+
+
+def add_zscore(df: pd.DataFrame, *, spec: IndicatorSpec, state: dict | None = None):
+    """
+    Add rolling z-score columns, (value - sma) / std over the last `window` values.
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        spec (IndicatorSpec): specification
+        state (dict | None): carry state of consecutive chunks of data. Default is None.
+    """
+    add_indicator_columns(df, indicator_targets(spec, [ColumnTypeEnum.ZSCORE]), state=state)
+
+
+def add_indicator_columns(df: pd.DataFrame, targets: list[tuple[str, int, str]], *, state: dict | None = None):
+    """
+    Add rolling indicator columns of given (indicator kind, window, source) triples.
+
+    Every indicator is computed in O(n) on numpy arrays: windowed indicators (SMA, STD, VOLATILITY, ZSCORE) of one
+    source share the cumulative sums of every window length, recursive ones (EMA, RSI, ATR) run a compiled loop (see
+    transforms.kernels). The first values without a full window are NaN (EMA starts from the first value).
+
+    Args:
+        df (pd.DataFrame): data from which columns are created
+        targets (list[tuple[str, int, str]]): indicator triples, e.g. (ColumnTypeEnum.SMA, 20, "close")
+        state (dict | None): carry state of consecutive chunks of data. Pass the same (initially empty) dictionary
+                        for every chunk, in time order, to get the same indicators as for the whole data at once.
+                        Default is None.
+    """
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return
+    state = {} if state is None else state
+    n_seen = state.get("n", 0)
+    tail = state.get("tail", {})
+
+    columns = list(dict.fromkeys(col for kind, _, src in targets for col in indicator_sources(kind, src)))
+    # computed in float64 (long cumulative sums lose precision in float32), written in the dtype of the sources
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in columns}
+    dtype = np.result_type(*(df[col].dtype for col in columns), np.float32)
+    # windowed indicators see the preceding rows too
+    offset = len(next(iter(tail.values()))) if tail else 0
+    extended = {col: np.concatenate([tail[col], values[col]]) if tail else values[col] for col in columns}
+
+    names = [indicator_name(*target) for target in targets]
+    # every indicator is written into a row of a single block, attached to df at once
+    out = np.empty((len(names), len(df)), dtype=dtype)
+    rows = dict(zip(names, out))
+
+    windowed: dict[str, dict[str, list[int]]] = {}
+    for kind, window, src in targets:
+        name = indicator_name(kind, window, src)
+        if kind in WINDOWED_INDICATORS:
+            windowed.setdefault(src, {}).setdefault(kind, []).append(window)
+            continue
+        rows[name][:], last = _recursive_indicator(kind, window, src, values, extended, state.get(name))
+        if kind in (ColumnTypeEnum.ATR, ColumnTypeEnum.RSI):
+            # ATR needs a full window of true ranges, RSI of price changes
+            rows[name][:max(window - (kind == ColumnTypeEnum.ATR) - n_seen, 0)] = np.nan
+        if last is not None:
+            state[name] = last
+
+    for src, kinds in windowed.items():
+        _windowed_indicators(src, kinds, extended[src], offset, rows)
+
+    attach_columns(df, rows)
+
+    # keep as many rows as the longest window (and a previous price) needs
+    n_tail = max([window + 1 for _, window, _ in targets])
+    state["tail"] = {col: extended[col][-n_tail:].copy() for col in columns}
+    state["n"] = n_seen + len(df)
+
+
+def _windowed_indicators(src: str, kinds: dict[str, list[int]], x: np.ndarray, offset: int,
+                         rows: dict[str, np.ndarray]) -> None:
+    """
+    Compute windowed indicators of a source, for every window length at once, into their rows (without the first
+    offset values of x).
+    """
+    windows = list(dict.fromkeys(w for kind, ws in kinds.items() if kind != ColumnTypeEnum.VOLATILITY for w in ws))
+    if windows:
+        center = x[0] if len(x) else 0.0
+        centered = x - center
+        squares = ColumnTypeEnum.STD in kinds or ColumnTypeEnum.ZSCORE in kinds
+        sums, sums_sq = rolling_sums(centered, windows, squares=squares)
+        for i, window in enumerate(windows):
+            std = None
+            if window in kinds.get(ColumnTypeEnum.STD, ()) or window in kinds.get(ColumnTypeEnum.ZSCORE, ()):
+                std = _std(sums[i], sums_sq[i], window)[offset:]
+            mean = np.divide(sums[i, offset:], window, out=sums[i, offset:])
+            if window in kinds.get(ColumnTypeEnum.SMA, ()):
+                np.add(mean, center, out=rows[indicator_name(ColumnTypeEnum.SMA, window, src)])
+            if window in kinds.get(ColumnTypeEnum.STD, ()):
+                rows[indicator_name(ColumnTypeEnum.STD, window, src)][:] = std
+            if window in kinds.get(ColumnTypeEnum.ZSCORE, ()):
+                row = rows[indicator_name(ColumnTypeEnum.ZSCORE, window, src)]
+                np.subtract(centered[offset:], mean, out=row)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    row /= std
+
+    if ColumnTypeEnum.VOLATILITY in kinds:
+        ws = kinds[ColumnTypeEnum.VOLATILITY]
+        log_returns = np.log(x[1:] / x[:-1])
+        sums, sums_sq = rolling_sums(log_returns, ws)
+        for i, window in enumerate(ws):
+            # the first value has no return
+            std = np.concatenate([[np.nan], _std(sums[i], sums_sq[i], window)]) if len(x) else x
+            rows[indicator_name(ColumnTypeEnum.VOLATILITY, window, src)][:] = std[offset:]
+
+
+def _std(sums: np.ndarray, sums_sq: np.ndarray, window: int) -> np.ndarray:
+    """
+    Compute the sample standard deviation from windowed sums (NaN for windows of length 1).
+    """
+    if window < 2:
+        return np.full_like(sums, np.nan)
+    var = np.multiply(sums, sums)
+    var *= -1.0 / window
+    var += sums_sq
+    var /= window - 1
+    # rounding may make the variance of constant values slightly negative
+    np.maximum(var, 0.0, out=var)
+    return np.sqrt(var, out=var)
+
+
+def _recursive_indicator(kind: str, window: int, src: str, values: dict[str, np.ndarray],
+                         extended: dict[str, np.ndarray], prev) -> tuple[np.ndarray, object]:
+    """
+    Compute a recursive indicator (EMA, RSI, ATR) of the current rows, continuing from the previous state.
+
+    Return:
+        Tuple of the indicator values and its state after the last row.
+    """
+    n = len(next(iter(values.values())))
+    if kind == ColumnTypeEnum.EMA:
+        result = exponential_smoothing(values[src], 2.0 / (window + 1), prev=prev)
+        return result, (result[-1] if n else prev)
+
+    if kind == ColumnTypeEnum.RSI:
+        x = extended[src]
+        changes = np.diff(x[-n - 1:]) if len(x) > n else np.diff(x, prepend=x[:1])
+        gains = np.maximum(changes, 0.0)
+        losses = np.maximum(-changes, 0.0)
+        prev_gain, prev_loss = prev if prev is not None else (None, None)
+        avg_gain = exponential_smoothing(gains, 1.0 / window, prev=prev_gain)
+        avg_loss = exponential_smoothing(losses, 1.0 / window, prev=prev_loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = 100.0 * avg_gain / (avg_gain + avg_loss)
+        return result, ((avg_gain[-1], avg_loss[-1]) if n else prev)
 
+    high, low = values[ColumnTypeEnum.HIGH], values[ColumnTypeEnum.LOW]
+    close = extended[ColumnTypeEnum.CLOSE]
+    prev_close = close[-n - 1:-1] if len(close) > n else np.concatenate([[np.nan], close[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    result = exponential_smoothing(true_range, 1.0 / window, prev=prev)
+    return result, (result[-1] if n else prev)
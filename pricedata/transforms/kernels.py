@@ -0,0 +1,257 @@
+from functools import cache
+
+import numpy as np
+
+# number of rows gathered at once by weighted_sums (a buffer of a few hundred KiB stays in the cache)
+WEIGHTED_SUMS_CHUNK = 16384
+
+
+def linear_recurrence(b: np.ndarray, a: float) -> np.ndarray:
+    """
+    Compute x[i] = a * x[i - 1] + b[i] along the last axis, with x[0] = b[0].
+
+    With numba installed, every row is computed in a single compiled pass. Otherwise, a vectorized doubling scan is
+    used: after k steps x[i] holds the sum of a^j * b[i - j] for j < 2^k, and the scan stops when a^(2^k) is below
+    the precision of the dtype, so the result matches the sequential recurrence up to floating-point rounding.
+
+    Args:
+        b (np.ndarray): input terms (float), 1-D or N-D (the recurrence runs along the last axis)
+        a (float): decay coefficient, 0 <= a < 1
+
+    Return:
+        np.ndarray: x, a new array of the same shape and dtype as b
+    """
+    if not 0.0 <= a < 1.0:
+        raise ValueError(f"Coefficient of the linear recurrence must be in [0, 1), got {a}.")
+
+    recurrence_loop = _recurrence_loop() if b.ndim and b.size else None
+    if recurrence_loop is not None:
+        rows = np.ascontiguousarray(b).reshape(-1, b.shape[-1])
+        return recurrence_loop(rows, b.dtype.type(a)).reshape(b.shape)
+
+    x = np.array(b, copy=True)
+    n = x.shape[-1]
+    tol = np.finfo(x.dtype).eps / 256
+    weight = a
+    shift = 1
+    while shift < n and weight > tol:
+        x[..., shift:] += weight * x[..., :-shift]
+        weight *= weight
+        shift *= 2
+    return x
+
+
+def heikin_ashi(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, *,
+                prev: tuple[float, float] | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute Heikin-Ashi candles with the recursive definition, along the last axis.
+
+    close_ha[i] = (open[i] + high[i] + low[i] + close[i]) / 4
+    open_ha[i] = (open_ha[i - 1] + close_ha[i - 1]) / 2, open_ha[0] = open[0] (or continues from prev)
+    high_ha[i] = max(high[i], open_ha[i], close_ha[i])
+    low_ha[i] = min(low[i], open_ha[i], close_ha[i])
+
+    Args:
+        open_ (np.ndarray): open prices
+        high (np.ndarray): high prices
+        low (np.ndarray): low prices
+        close (np.ndarray): close prices
+        prev (tuple[float, float] | None): open_ha and close_ha of the candle preceding the first one. Default is
+                        None (the first open_ha is the first open).
+
+    Return:
+        Tuple of open_ha, high_ha, low_ha, close_ha arrays.
+    """
+    close_ha = np.add(open_, high)
+    close_ha += low
+    close_ha += close
+    close_ha *= 0.25
+
+    terms = np.empty_like(close_ha)
+    if close_ha.shape[-1]:
+        terms[..., 0] = open_[..., 0] if prev is None else 0.5 * (prev[0] + prev[1])
+        np.multiply(close_ha[..., :-1], 0.5, out=terms[..., 1:])
+    open_ha = linear_recurrence(terms, 0.5)
+
+    high_ha = np.maximum(open_ha, close_ha, out=terms)
+    np.maximum(high_ha, high, out=high_ha)
+    low_ha = np.minimum(open_ha, close_ha)
+    np.minimum(low_ha, low, out=low_ha)
+    return open_ha, high_ha, low_ha, close_ha
+
+
+def weighted_sums(columns: list[np.ndarray], weights: np.ndarray) -> np.ndarray:
+    """
+    Compute many weighted sums of the same columns in one pass.
+
+    The columns are gathered into a (k, chunk) buffer and multiplied by the weights, out = weights.T @ columns, one
+    chunk of rows at a time, so no full-size copy of the columns is made. Every output row is contiguous (the layout
+    of a pandas block).
+
+    Args:
+        columns (list[np.ndarray]): k input columns of length n
+        weights (np.ndarray): (k, m) weights of the m outputs
+
+    Return:
+        np.ndarray: (m, n) array of outputs, of the common dtype of the columns (at least float32)
+    """
+    dtype = np.result_type(*columns, np.float32)
+    n = len(columns[0]) if columns else 0
+    w = weights.T.astype(dtype, copy=False)
+    out = np.empty((w.shape[0], n), dtype=dtype)
+    stacked = np.empty((len(columns), min(n, WEIGHTED_SUMS_CHUNK)), dtype=dtype)
+    for start in range(0, n, WEIGHTED_SUMS_CHUNK):
+        stop = min(start + WEIGHTED_SUMS_CHUNK, n)
+        block = stacked[:, :stop - start]
+        for row, column in zip(block, columns):
+            row[:] = column[start:stop]
+        np.matmul(w, block, out=out[:, start:stop])
+    return out
+
+
+def ratios(x: np.ndarray, horizon: int, *, forward: bool = False, offset: int = 0) -> np.ndarray:
+    """
+    Compute ratios of values horizon steps apart along the last axis, in one division for all leading axes.
+
+    backward: y[..., t] = x[..., offset + t] / x[..., offset + t - horizon]
+    forward: y[..., t] = x[..., offset + t + horizon] / x[..., offset + t]
+
+    Args:
+        x (np.ndarray): values (float), the first offset values along the last axis only precede the others
+        horizon (int): distance of the compared values, at least 1
+        forward (bool): if true, compare with the following values, otherwise with the preceding ones. Default is
+                        false.
+        offset (int): number of preceding values. Default is 0.
+
+    Return:
+        np.ndarray: y, a new (..., x.shape[-1] - offset) array of the dtype of x (at least float32). Ratios which
+        would need values outside of x are NaN.
+    """
+    size = x.shape[-1]
+    n = size - offset
+    y = np.empty(x.shape[:-1] + (n,), dtype=np.result_type(x, np.float32))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if forward:
+            stop = min(max(n - horizon, 0), n)
+            np.divide(x[..., offset + horizon:offset + horizon + stop], x[..., offset:offset + stop], out=y[..., :stop])
+            y[..., stop:] = np.nan
+        else:
+            start = min(max(horizon - offset, 0), n)
+            np.divide(x[..., offset + start:], x[..., offset + start - horizon:max(size - horizon, 0)],
+                      out=y[..., start:])
+            y[..., :start] = np.nan
+    return y
+
+
+def exponential_smoothing(x: np.ndarray, alpha: float, *, prev: float | None = None) -> np.ndarray:
+    """
+    Compute y[i] = alpha * x[i] + (1 - alpha) * y[i - 1] along the last axis, with y[0] = x[0] (or continued from prev).
+
+    It is the same as pandas ewm(alpha=alpha, adjust=False).mean() for data without NaN.
+
+    Args:
+        x (np.ndarray): input values (float)
+        alpha (float): smoothing factor, 0 < alpha <= 1
+        prev (float | None): y of the value preceding the first one. Default is None.
+
+    Return:
+        np.ndarray: y, a new array of the same shape and dtype as x
+    """
+    b = np.multiply(x, alpha)
+    if x.shape[-1]:
+        b[..., 0] = x[..., 0] if prev is None else b[..., 0] + (1.0 - alpha) * prev
+    return linear_recurrence(b, 1.0 - alpha)
+
+
+def rolling_sums(x: np.ndarray, windows: list[int], *,
+                 squares: bool = True) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Compute sums of x and of x ** 2 over trailing windows of many lengths at once.
+
+    Windowed sums are differences of cumulative sums. The cumulative sums restart in every block of rows (of at least
+    the longest window), so their magnitude, and the rounding error of the differences, does not grow with the length
+    of the data. Center x (e.g. subtract its first value) before the call to keep sums of squares precise.
+
+    Args:
+        x (np.ndarray): 1-D input values (float, without NaN)
+        windows (list[int]): window lengths
+        squares (bool): if false, sums of squares are not computed (None is returned instead). Default is true.
+
+    Return:
+        Tuple of two (len(windows), len(x)) arrays: sums and sums of squares. The first w - 1 values of the window of
+        length w are NaN.
+    """
+    n = len(x)
+    sums = np.empty((len(windows), n), dtype=np.result_type(x, np.float32))
+    sums_sq = np.empty_like(sums) if squares else None
+    if not n or not windows:
+        return sums, sums_sq
+
+    block = max(max(windows), 1024)
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block, dtype=sums.dtype)
+    padded[:n] = x
+    by_end = np.empty_like(padded)
+    for out, values in ((sums, padded), (sums_sq, padded)):
+        if out is None:
+            continue
+        if out is sums_sq:
+            values = np.multiply(padded, padded, out=padded)
+        inclusive = values.reshape(n_blocks, block).cumsum(axis=1)
+        totals = inclusive[:, -1]
+        inclusive = inclusive.ravel()
+
+        for row, window in zip(out, windows):
+            row[:window - 1] = np.nan
+            if window > n:
+                continue
+            # inclusive sum at the end minus exclusive sum at the start (the preceding values of the same block)
+            start = len(padded) - window + 1
+            np.subtract(inclusive[window - 1:], inclusive[:start], out=by_end[window - 1:])
+            by_end[window - 1:] += values[:start]
+            # a window ending in the first window - 1 rows of a block starts in the previous block
+            by_end.reshape(n_blocks, block)[1:, :window - 1] += totals[:-1, None]
+            row[window - 1:] = by_end[window - 1:n]
+    return sums, sums_sq
+
+
+@cache
+def _recurrence_loop():
+    """
+    Compile the sequential recurrence with numba (if installed), on the first use: importing numba takes longer than
+    importing the rest of the package.
+    """
+    njit = _njit()
+    if njit is None:
+        return None
+
+    @njit(cache=True, nogil=True)
+    def recurrence_loop(b, a):
+        x = np.empty_like(b)
+        for row in range(b.shape[0]):
+            acc = b.dtype.type(0.0)
+            for i in range(b.shape[1]):
+                acc = a * acc + b[row, i]
+                x[row, i] = acc
+        return x
+
+    return recurrence_loop
+
+
+def _njit():
+    """
+    Get numba.njit, None if numba is not installed.
+    """
+    try:
+        from numba import njit
+    except ModuleNotFoundError:
+        # without numba, recurrences are computed with a vectorized scan
+        return None
+    return njit
+
+
+def __getattr__(name: str):
+    # numba is imported lazily, njit of this module is None if it is not installed
+    if name == "njit":
+        return _njit()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
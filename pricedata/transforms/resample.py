@@ -0,0 +1,59 @@
+import pandas as pd
+
+from pricedata.utils.dev_types.dev_types import ColumnTypeEnum
+from pricedata.utils.intervals import interval_timedelta, is_monthly
+
+
+# first Monday after epoch, weeks start on Monday as on TradingView
+WEEK_ORIGIN = pd.Timestamp("1970-01-05", tz="UTC")
+
+AGGREGATION = {
+    ColumnTypeEnum.OPEN: "first",
+    ColumnTypeEnum.HIGH: "max",
+    ColumnTypeEnum.LOW: "min",
+    ColumnTypeEnum.CLOSE: "last",
+    ColumnTypeEnum.VOLUME: "sum",
+    ColumnTypeEnum.SYMBOL: "first",
+}
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str, *, offset: str | pd.Timedelta | None = None,
+                   drop_partial_first: bool = True) -> pd.DataFrame:
+    """
+    Build bars of a higher interval from standard OHLCV bars.
+
+    Aggregation: open - first, high - max, low - min, close - last, volume - sum, symbol - first. Other columns take
+    the last value of the bucket. Buckets are aligned to UTC: intraday and daily buckets to the epoch, weekly buckets
+    to Monday 00:00 and monthly buckets to the first day of the month. Use offset to align buckets to a session, e.g.
+    offset="14h30min" for daily bars starting at 14:30 UTC. Buckets without bars (e.g. market closures) are skipped.
+    Every bar is labeled with the start of its bucket.
+
+    Args:
+        df (pd.DataFrame): standard OHLCV bars with UTC DatetimeIndex
+        interval (str): target interval, e.g. "5m", "1h", "1d", "1w", "1M"
+        offset (str | pd.Timedelta | None): shift of the buckets alignment. Default is None.
+        drop_partial_first (bool): if true, drop the first bucket when df starts in the middle of it. Default is true.
+
+    Return:
+        pd.DataFrame: resampled bars
+    """
+    agg = {col: AGGREGATION.get(col, "last") for col in df.columns}
+
+    if is_monthly(interval):
+        rule = dict(rule="MS")
+    elif interval_timedelta(interval) % pd.Timedelta(weeks=1) == pd.Timedelta(0):
+        rule = dict(rule=interval_timedelta(interval), origin=WEEK_ORIGIN)
+    else:
+        rule = dict(rule=interval_timedelta(interval), origin="epoch")
+    if offset is not None:
+        rule["offset"] = offset
+
+    resampled = df.resample(**rule, closed="left", label="left").agg(agg)
+
+    # count of bars is 0 for empty buckets
+    counts = df[df.columns[0]].resample(**rule, closed="left", label="left").size()
+    resampled = resampled[counts.to_numpy() > 0]
+
+    if drop_partial_first and len(resampled) and df.index[0] > resampled.index[0]:
+        resampled = resampled.iloc[1:]
+    return resampled
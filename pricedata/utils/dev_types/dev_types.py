@@ -1,5 +1,8 @@
+from collections.abc import Callable
 from enum import StrEnum, Enum
+from functools import lru_cache
 import re
+import threading
 Enums = Enum | StrEnum
 
 
@@ -11,6 +14,25 @@ class CandleKindEnum(StrEnum):
     HA = "ha"
 
 
+class StorageFormatEnum(StrEnum):
+    """
+    StrEnum for handling cache storage formats.
+    """
+    CSV = "csv"
+    PARQUET = "parquet"
+    FEATHER = "feather"
+    NPZ = "npz"
+    MEMMAP = "memmap"
+
+
+class DirectionEnum(StrEnum):
+    """
+    StrEnum for handling directions of returns.
+    """
+    BACKWARD = "backward"
+    FORWARD = "forward"
+
+
 class ColumnTypeEnum(StrEnum):
     """
     StrEnum for handling every column name.
@@ -44,6 +66,21 @@ class ColumnTypeEnum(StrEnum):
     HL2 = "hl2"
     HL2_HA = "hl2-ha"
 
+    SMA = "sma"
+    SMA_ = "sma-"
+    EMA = "ema"
+    EMA_ = "ema-"
+    ATR = "atr"
+    ATR_ = "atr-"
+    RSI = "rsi"
+    RSI_ = "rsi-"
+    STD = "std"
+    STD_ = "std-"
+    VOLATILITY = "volatility"
+    VOLATILITY_ = "volatility-"
+    ZSCORE = "zscore"
+    ZSCORE_ = "zscore-"
+
 
 class ColumnTypeSetEnum(Enum):
     """
@@ -81,7 +118,7 @@ def _normalize(s: str | list[str]) -> str | list[str]:
         Normalized text. The type is the same as `s` input parameter.
     """
     if isinstance(s, str):
-        return re.sub(r"(?:\W|_)+", "-", s).strip("-").lower()
+        return _normalize_key(s)
 
     if any(isinstance(s_, list) for s_ in s):
         flattened_s = []
@@ -91,19 +128,57 @@ def _normalize(s: str | list[str]) -> str | list[str]:
             else:
                 flattened_s.append(s_element)
         s = flattened_s
-    return [re.sub(r"(?:\W|_)+", "-", x).strip("-").lower() for x in s]
+    return [_normalize_key(x) for x in s]
+
+
+_SEPARATORS = re.compile(r"(?:\W|_)+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_key(s: str) -> str:
+    """
+    Normalize a single text (see _normalize). Memoized: the same few aliases are normalized over and over.
+    """
+    return _SEPARATORS.sub("-", s).strip("-").lower()
 
 
 class Registry:
     """
     Class using for register allowed input types aliases.
+
+    Aliases can be registered by deferred functions (see defer), which run on the first lookup of any registry.
     """
     _map: dict[str, Enums] = {}
+    # deferred registrations, shared by every registry
+    _deferred: list[Callable[[], None]] = []
+    _deferred_lock = threading.Lock()
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls._map = {}
 
+    @staticmethod
+    def defer(register: Callable[[], None]) -> None:
+        """
+        Run a function registering aliases on the first lookup instead of now.
+
+        Args:
+            register (Callable[[], None]): function registering aliases
+        """
+        Registry._deferred.append(register)
+
+    @staticmethod
+    def _run_deferred() -> None:
+        """
+        Run deferred registrations. A registration is removed only after it ran, so a concurrent lookup waits for it.
+        """
+        if not Registry._deferred:
+            return
+        with Registry._deferred_lock:
+            while Registry._deferred:
+                Registry._deferred[0]()
+                Registry._deferred.pop(0)
+
     @classmethod
     def register(cls, value: Enums, *aliases: str):
         """
@@ -118,9 +193,14 @@ class Registry:
 
     @classmethod
     def __class_getitem__(cls, key: str) -> Enums:
-        if key in cls.registered_keys():
-            return cls._map[_normalize(key)]
-        raise KeyError(f"The {key} is not registered. Please use one of: {cls.registered_keys()}")
+        Registry._run_deferred()
+        # aliases are stored normalized, so an already normalized key needs a single dict lookup
+        value = cls._map.get(key)
+        if value is None and isinstance(key, str):
+            value = cls._map.get(_normalize_key(key))
+        if value is None:
+            raise KeyError(f"The {key} is not registered. Please use one of: {cls.registered_keys()}")
+        return value
 
     @classmethod
     def registered_keys(cls):
@@ -130,6 +210,7 @@ class Registry:
         Return:
              All registered aliases
         """
+        Registry._run_deferred()
         return tuple(cls._map.keys())
 
 
@@ -144,3 +225,11 @@ class ColumnType(Registry):
 class ColumnTypeSet(Registry):
     value = None
 
+
+class StorageFormat(Registry):
+    value = None
+
+
+class Direction(Registry):
+    value = None
+
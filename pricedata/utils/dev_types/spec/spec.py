@@ -1,82 +1,135 @@
+from functools import lru_cache
+
 from attrs import define, field
-from pricedata.utils.dev_types.dev_types import _normalize, CandleKind, ColumnType, ColumnTypeEnum
+from pricedata.utils.dev_types.dev_types import (
+    CandleKind, CandleKindEnum, ColumnType, ColumnTypeEnum, Direction, DirectionEnum, Enums, Registry
+)
 
 
-@define(slots=True, kw_only=True)
-class DropColumnsSpec:
+def _keys(value) -> tuple:
     """
-    Attr for dropping columns specyfications.
+    Get the keys of a field value: a single key or a (possibly nested) list of keys.
+    """
+    if isinstance(value, str):
+        return (value,)
+    keys = []
+    for item in value:
+        if isinstance(item, list | tuple):
+            keys.extend(item)
+        else:
+            keys.append(item)
+    return tuple(keys)
+
+
+@lru_cache(maxsize=4096)
+def _resolve(registry: type[Registry], keys: tuple) -> tuple[Enums, ...]:
     """
-    cols: str | list[str] | ColumnType | list[ColumnType] = field(converter=_normalize)
+    Resolve keys (aliases) to unique enum values, in order. Memoized: specifications repeat the same keys.
+    """
+    return tuple(dict.fromkeys(registry[key] for key in keys))
 
-    def __attrs_post_init__(self):
-        if isinstance(self.cols, str | ColumnType):
-            self.cols = [self.cols]
 
-        if isinstance(self.cols, list):
-            self.cols = [
-                ColumnType[col] if isinstance(col, str) else col
-                for col in self.cols
-            ]
+def _column_types(value) -> tuple[ColumnTypeEnum, ...]:
+    return _resolve(ColumnType, _keys(value))
 
 
-@define(slots=True, kw_only=True)
-class OHLCSpec:
+@lru_cache(maxsize=4096)
+def _columns(keys: tuple) -> tuple[ColumnTypeEnum | str, ...]:
     """
-    Attr for OHLC column specification.
+    Resolve column names: registered aliases to enum values, other names (generated feature columns, e.g.
+    sma-20-close, log-return-close) are kept as they are.
     """
-    feature_kinds: str | list[str] | ColumnType | list[ColumnType] = field(converter=_normalize, default="ohlc4")
-    candle_kinds: str | list[str] | CandleKind | list[CandleKind] = field(converter=_normalize, default="standard")
+    cols = []
+    for key in keys:
+        try:
+            cols.append(ColumnType[key])
+        except KeyError:
+            if not isinstance(key, str):
+                raise
+            cols.append(key)
+    return tuple(dict.fromkeys(cols))
+
 
-    def __attrs_post_init__(self):
-        if isinstance(self.feature_kinds, str | ColumnType):
-            self.feature_kinds = [self.feature_kinds]
+def _candle_kinds(value) -> tuple[CandleKindEnum, ...]:
+    return _resolve(CandleKind, _keys(value))
 
-        self.feature_kinds = [
-            ColumnType[fk] if isinstance(fk, str) else fk
-            for fk in self.feature_kinds
-        ]
-        self.feature_kinds = list(dict.fromkeys(self.feature_kinds))
 
-        if isinstance(self.candle_kinds, str | CandleKind):
-            self.candle_kinds = [self.candle_kinds]
+def _column_types_or(default: ColumnTypeEnum):
+    """
+    Get a converter of column types which are the default if none are given.
+    """
+    def convert(value) -> tuple[ColumnTypeEnum, ...]:
+        keys = _keys(value) if value else ()
+        return _resolve(ColumnType, keys) if any(keys) else (default,)
+    return convert
 
-        self.candle_kinds = [
-            CandleKind[ck] if isinstance(ck, str) else ck
-            for ck in self.candle_kinds
-        ]
-        self.candle_kinds = list(dict.fromkeys(self.candle_kinds))
 
+def _direction(value) -> DirectionEnum:
+    return _resolve(Direction, (value,))[0]
 
-@define(slots=True, kw_only=True)
-class ReturnSpec:
+
+def _positive(name: str, *, required: bool = False):
     """
-    Attr for return column specification.
+    Get a converter of unique positive integers (e.g. windows, horizons).
     """
-    feature_kinds: str | list[str] | ColumnType | list[ColumnType] = field(converter=_normalize, default='return')
-    sources: str | list[str] | ColumnType | list[ColumnType] = field(converter=_normalize, default='close')
+    def convert(value) -> tuple[int, ...]:
+        values = tuple(dict.fromkeys(int(v) for v in ([value] if isinstance(value, int) else value)))
+        if required and not values:
+            raise ValueError(f"{name} must not be empty")
+        if any(v < 1 for v in values):
+            raise ValueError(f"{name} must be positive, got {list(values)}")
+        return values
+    return convert
 
-    def __attrs_post_init__(self):
-        if not self.feature_kinds:
-            self.feature_kinds = ['return']
 
-        if isinstance(self.feature_kinds, str | ColumnType):
-            self.feature_kinds = [self.feature_kinds]
+# Specifications are frozen and hashable: aliases are resolved once, on creation, into tuples of enum values, and
+# specifications equal in their resolved values share memoized plan steps (see core.plan.feature_steps).
 
-        self.feature_kinds = [
-            ColumnType[fk] if isinstance(fk, str) else fk
-            for fk in self.feature_kinds
-        ]
 
-        if not self.sources:
-            self.sources = [ColumnTypeEnum.CLOSE]
+@define(slots=True, kw_only=True, frozen=True, cache_hash=True)
+class DropColumnsSpec:
+    """
+    Attr for dropping columns specyfications.
+
+    Columns are given by aliases of column types or by names of generated feature columns (e.g. sma-20-close).
+    """
+    cols: str | list[str] | ColumnType | list[ColumnType] = field(converter=lambda value: _columns(_keys(value)))
+
+
+@define(slots=True, kw_only=True, frozen=True, cache_hash=True)
+class OHLCSpec:
+    """
+    Attr for OHLC column specification.
+    """
+    feature_kinds: str | list[str] | ColumnType | list[ColumnType] = field(converter=_column_types, default="ohlc4")
+    candle_kinds: str | list[str] | CandleKind | list[CandleKind] = field(converter=_candle_kinds, default="standard")
 
-        if isinstance(self.sources, str | ColumnType):
-            self.sources = [self.sources]
 
-        self.sources = [
-            ColumnType[s] if (
-                        isinstance(s, str) and ColumnType[s] not in (ColumnTypeEnum.VOLUME, ColumnTypeEnum.SYMBOL))
-            else s
-            for s in self.sources
-        ]
+@define(slots=True, kw_only=True, frozen=True, cache_hash=True)
+class ReturnSpec:
+    """
+    Attr for return column specification.
+
+    Backward returns over h bars compare a bar with the bar h bars before it, forward returns compare the bar h bars
+    after it with the bar.
+    """
+    feature_kinds: str | list[str] | ColumnType | list[ColumnType] = field(
+        converter=_column_types_or(ColumnTypeEnum.RETURN), default="return"
+    )
+    sources: str | list[str] | ColumnType | list[ColumnType] = field(
+        converter=_column_types_or(ColumnTypeEnum.CLOSE), default="close"
+    )
+    horizons: int | list[int] = field(converter=_positive("Horizons", required=True), default=1)
+    direction: str | Direction = field(converter=_direction, default="backward")
+
+
+@define(slots=True, kw_only=True, frozen=True, cache_hash=True)
+class IndicatorSpec:
+    """
+    Attr for rolling indicator column specification.
+    """
+    feature_kinds: str | list[str] | ColumnType | list[ColumnType] = field(converter=_column_types, default="sma")
+    windows: int | list[int] = field(converter=_positive("Windows", required=True), default=14)
+    sources: str | list[str] | ColumnType | list[ColumnType] = field(
+        converter=_column_types_or(ColumnTypeEnum.CLOSE), default="close"
+    )
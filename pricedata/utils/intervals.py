@@ -0,0 +1,71 @@
+from functools import lru_cache
+import re
+
+import pandas as pd
+
+
+MONTHLY_INTERVALS = ("1M", "1mth", "1mon", "1mo", "1m_")
+
+# units of parsed intervals: minute, hour, day, week and month ("M", the only case-sensitive unit)
+UNITS = {"m": "min", "h": "h", "d": "D", "w": "W"}
+
+
+@lru_cache(maxsize=256)
+def parse_interval(interval_str: str) -> tuple[int, str]:
+    """
+    Parse a str interval into the number of units and the unit.
+
+    Every other function of intervals (and the mapping into tvDatafeed intervals) goes through this parser, so an
+    interval means the same everywhere. Units are case-insensitive, except for "M" (month) and "m" (minute): "1M"
+    (or "M", "1mth", "1mon", "1mo", "1m_") is one month, "1m" (or "m") is one minute.
+
+    Args:
+        interval_str (str): bar interval, e.g. "1m", "15m", "1h", "1d", "1w", "1M"
+
+    Return:
+        tuple[int, str]: number of units and the unit: "m", "h", "d", "w" or "M"
+    """
+    s = interval_str.strip()
+    if s in ("1M", "M") or s.lower() in MONTHLY_INTERVALS[1:]:
+        return 1, "M"
+    if s.endswith("M"):
+        # only one month is supported, never read e.g. "2M" as two minutes
+        raise ValueError(f"Unsupported interval: '{interval_str}'")
+    s = s.lower()
+    s = {"d": "1d", "w": "1w", "m": "1m"}.get(s, s)
+    match = re.fullmatch(r"(\d+)([mhdw])", s)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Unsupported interval: '{interval_str}'")
+    return int(match.group(1)), match.group(2)
+
+
+def is_monthly(interval_str: str) -> bool:
+    """
+    Check whether a given interval is one month.
+
+    Args:
+        interval_str (str): bar interval, e.g. "1m", "1h", "1M"
+
+    Return:
+        bool: true for monthly interval, false for other and unsupported intervals
+    """
+    try:
+        return parse_interval(interval_str)[1] == "M"
+    except ValueError:
+        return False
+
+
+def interval_timedelta(interval_str: str) -> pd.Timedelta:
+    """
+    Map str interval into its (approximate for months) duration.
+
+    Args:
+        interval_str (str): bar interval, e.g. "1m", "1h", "1d"
+
+    Return:
+        pd.Timedelta: duration of a single bar
+    """
+    count, unit = parse_interval(interval_str)
+    if unit == "M":
+        return pd.Timedelta(days=31)
+    return pd.Timedelta(count, UNITS[unit])
@@ -0,0 +1,127 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def attach_columns(df: pd.DataFrame, columns: dict[str, np.ndarray]) -> None:
+    """
+    Attach freshly computed arrays to df as columns, without copying them.
+
+    Setting a column from a numpy array copies the array (pandas copy-on-write cannot know who else holds it). The
+    arrays computed by transforms belong to nobody else, so the frame takes them over as they are.
+
+    Args:
+        df (pd.DataFrame): data to which columns are attached (in place)
+        columns (dict[str, np.ndarray]): arrays of length len(df), keyed by column name. Do not use them afterwards.
+    """
+    for name, values in columns.items():
+        df[name] = pd.Series(values, index=df.index, copy=False)
+
+
+@dataclass(slots=True)
+class MemoryStage:
+    """
+    Memory used by a single pipeline stage, in bytes.
+
+    allocated: net change of the traced memory (negative if the stage released more than it allocated)
+    peak: highest traced memory during the stage, above the traced memory at its start
+    frame_bytes: size of the data after the stage
+    """
+    name: str
+    allocated: int
+    peak: int
+    frame_bytes: int
+
+
+@dataclass(slots=True)
+class MemoryReport:
+    """
+    Memory accounting of a pipeline, relative to the traced memory before its first stage.
+
+    peak: highest traced memory during any stage, above the baseline
+    retained: traced memory after the last stage, above the baseline (held by the pipeline or leaked by it)
+    data_bytes: size of the loaded data (before any transform)
+    """
+    stages: list[MemoryStage] = field(default_factory=list)
+    peak: int = 0
+    retained: int = 0
+    data_bytes: int = 0
+
+    @property
+    def peak_ratio(self) -> float:
+        """
+        Get the peak as a multiple of the loaded data size.
+        """
+        return self.peak / self.data_bytes if self.data_bytes else 0.0
+
+    def __str__(self) -> str:
+        mib = 1024 ** 2
+        lines = [f"{'stage':<12} {'allocated MiB':>14} {'peak MiB':>10} {'frame MiB':>10}"]
+        lines.extend(
+            f"{s.name:<12} {s.allocated / mib:>14.1f} {s.peak / mib:>10.1f} {s.frame_bytes / mib:>10.1f}"
+            for s in self.stages
+        )
+        lines.append(f"peak {self.peak / mib:.1f} MiB ({self.peak_ratio:.2f}x the loaded data), "
+                     f"retained {self.retained / mib:.1f} MiB")
+        return "\n".join(lines)
+
+
+class MemoryTracker:
+    """
+    Debug accounting of memory allocated by pipeline stages, with tracemalloc.
+
+    Tracing starts with the first stage and stays on until stop() (tracemalloc slows allocations down, so use it
+    for debugging only); used as a context manager, the tracker stops on exit. Memory is reported above the traced
+    memory at the first stage, so allocations made before (or by other code, when tracing was already on) are not
+    counted. numpy arrays, and so pandas columns, are traced; memory mapped files are not.
+    """
+    def __init__(self):
+        self.report = MemoryReport()
+        self._started = False
+        self._baseline: int | None = None
+
+    def __enter__(self) -> "MemoryTracker":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @contextmanager
+    def stage(self, name: str, frame=None):
+        """
+        Track a stage.
+
+        Args:
+            name (str): stage name
+            frame (Callable[[], pd.DataFrame | None] | None): returns the data after the stage. Default is None.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+            self._baseline = None
+        if self._baseline is None:
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            df = frame() if frame is not None else None
+            frame_bytes = int(df.memory_usage(deep=True).sum()) if df is not None else 0
+            self.report.stages.append(MemoryStage(name, current - start, peak - start, frame_bytes))
+            self.report.peak = max(self.report.peak, peak - self._baseline)
+            self.report.retained = current - self._baseline
+            if name == "load":
+                self.report.data_bytes = frame_bytes
+
+    def stop(self) -> None:
+        """
+        Stop tracing, if it was started by this tracker.
+        """
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
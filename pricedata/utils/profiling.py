@@ -0,0 +1,212 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+
+@dataclass(slots=True)
+class ProfileEvent:
+    """
+    A timed pipeline stage (or an instant event, e.g. a cache hit).
+
+    start: time.perf_counter() at the start of the stage, in seconds
+    duration: duration of the stage in seconds, 0 for instant events
+    rows: number of rows of the data processed by the stage (if known)
+    bytes: size of the data processed by the stage (if known): the frame after the stage, or the file read or written
+    args: further details, e.g. symbol, path, attempt number, error
+    """
+    name: str
+    category: str
+    start: float
+    duration: float = 0.0
+    rows: int | None = None
+    bytes: int | None = None
+    thread: int = 0
+    instant: bool = False
+    args: dict = field(default_factory=dict)
+
+    def record(self, df: pd.DataFrame) -> None:
+        """
+        Record the number of rows and the size (without the content of object columns) of the data.
+
+        Args:
+            df (pd.DataFrame): data of the stage
+        """
+        self.rows = len(df)
+        self.bytes = int(df.memory_usage(index=True, deep=False).sum())
+
+
+# a sink receives every finished event
+Sink = Callable[[ProfileEvent], None]
+
+
+class Profiler:
+    """
+    Emits timing events of pipeline stages to sinks.
+
+    Sinks are callables which receive every finished ProfileEvent, e.g. a plain function, LoggingSink or
+    ChromeTraceSink. Events of different threads are emitted concurrently, so sinks must be thread-safe.
+    Pass the profiler to DataLoader(profiler=...) (Data uses the profiler of its loader by default).
+    """
+    def __init__(self, *sinks: Sink):
+        self.sinks: list[Sink] = list(sinks)
+        # time origin of trace timestamps
+        self.origin = time.perf_counter()
+
+    def add_sink(self, sink: Sink) -> "Profiler":
+        self.sinks.append(sink)
+        return self
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """
+        Time a stage. The yielded event can be filled with rows, bytes and args before the stage ends. If the stage
+        raises, the error is recorded in args.
+
+        Args:
+            name (str): stage name
+            category (str): stage category, e.g. "loader" or "data"
+            **args: details of the stage
+        """
+        event = ProfileEvent(name, category, time.perf_counter(), thread=threading.get_ident(), args=args)
+        try:
+            yield event
+        except BaseException as error:
+            event.args["error"] = repr(error)
+            raise
+        finally:
+            event.duration = time.perf_counter() - event.start
+            self.emit(event)
+
+    def instant(self, name: str, category: str, **args) -> None:
+        """
+        Emit an instant event.
+
+        Args:
+            name (str): event name
+            category (str): event category
+            **args: details of the event
+        """
+        self.emit(ProfileEvent(name, category, time.perf_counter(), thread=threading.get_ident(), instant=True,
+                               args=args))
+
+    def emit(self, event: ProfileEvent) -> None:
+        for sink in self.sinks:
+            sink(event)
+
+
+# the context of disabled profiling, shared to avoid any allocation
+_DISABLED = nullcontext()
+
+
+def span(profiler: Profiler | None, name: str, category: str, **args):
+    """
+    Time a stage with a profiler, if given. Without a profiler, the context yields None and costs a function call.
+
+    Args:
+        profiler (Profiler | None): the profiler
+        name (str): stage name
+        category (str): stage category
+        **args: details of the stage
+
+    Return:
+        Context manager which yields ProfileEvent | None.
+    """
+    if profiler is None:
+        return _DISABLED
+    return profiler.span(name, category, **args)
+
+
+class LoggingSink:
+    """
+    Logs every event as a single line, e.g.
+    loader/read 12.31 ms rows=100000 bytes=5600000 format=parquet
+    """
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.DEBUG):
+        self.logger = logger if logger is not None else logging.getLogger("pricedata.profiling")
+        self.level = level
+
+    def __call__(self, event: ProfileEvent) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        parts = [f"{event.category}/{event.name}"]
+        if not event.instant:
+            parts.append(f"{event.duration * 1e3:.2f} ms")
+        if event.rows is not None:
+            parts.append(f"rows={event.rows}")
+        if event.bytes is not None:
+            parts.append(f"bytes={event.bytes}")
+        parts.extend(f"{key}={value}" for key, value in event.args.items())
+        self.logger.log(self.level, " ".join(parts))
+
+
+class ChromeTraceSink:
+    """
+    Collects events in the Chrome trace-event format, which can be opened in chrome://tracing or Perfetto.
+
+    Stages are complete events ("X") and instant events ("i"), with timestamps in microseconds since the start of
+    the profiler. Rows, bytes and args are shown in the details of an event.
+    """
+    def __init__(self, profiler: Profiler | None = None):
+        """
+        Args:
+            profiler (Profiler | None): profiler whose start is the time origin. Default is None (the creation of
+                        the sink).
+        """
+        self.origin = profiler.origin if profiler is not None else time.perf_counter()
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ProfileEvent) -> None:
+        with self._lock:
+            args = dict(event.args)
+            if event.rows is not None:
+                args["rows"] = event.rows
+            if event.bytes is not None:
+                args["bytes"] = event.bytes
+            trace_event = {
+                "name": event.name,
+                "cat": event.category,
+                "ph": "i" if event.instant else "X",
+                "ts": (event.start - self.origin) * 1e6,
+                "pid": os.getpid(),
+                "tid": event.thread,
+                "args": {key: _json_value(value) for key, value in args.items()},
+            }
+            if event.instant:
+                trace_event["s"] = "t"
+            else:
+                trace_event["dur"] = event.duration * 1e6
+            self.events.append(trace_event)
+
+    def trace(self) -> dict:
+        """
+        Get the trace as a JSON object.
+        """
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, path: Path) -> None:
+        """
+        Write the trace into a JSON file.
+
+        Args:
+            path (Path): path to the trace file
+        """
+        Path(path).write_text(json.dumps(self.trace()))
+
+
+def _json_value(value):
+    """
+    Get a JSON serializable value of an event detail.
+    """
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
@@ -0,0 +1,93 @@
+"""
+Deterministic synthetic OHLCV bars for benchmarks and the fake client (pricedata.io.fake_client).
+
+Prices are a geometric random walk with volatility clustering, each bar opens at the previous close and its high
+and low enclose the open and close. Volume is log-normal, with a daily cycle and higher volume on large moves. The
+same arguments always give the same bars.
+
+Optionally, the data contains duplicated bars (as a repeated download) and gaps (missing runs of bars, e.g. a
+halted market), and can be returned raw (in the format of TvDatafeed.get_hist: naive "datetime" index, unsorted
+with duplicates) to exercise normalization.
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n_rows: int, *, seed: int = 0, symbol: str = "SYNTH:TEST", freq: str = "min",
+               start: str = "2000-01-03", price: float = 100.0, volatility: float = 0.001, duplicates: float = 0.0,
+               gaps: float = 0.0, raw: bool = False) -> pd.DataFrame:
+    """
+    Generate synthetic OHLCV bars.
+
+    Args:
+        n_rows (int): number of bars (before duplicates are added)
+        seed (int): random seed. Default is 0.
+        symbol (str): value of the symbol column. Default is "SYNTH:TEST".
+        freq (str): bar interval (pandas frequency). Default is "min".
+        start (str): time of the first bar. Default is "2000-01-03".
+        price (float): first open price. Default is 100.0.
+        volatility (float): average standard deviation of logarithmic returns of a bar. Default is 0.001.
+        duplicates (float): fraction of bars which appear twice, appended at the end (raw data only, normalized
+                        data has unique bars). Default is 0.0.
+        gaps (float): approximate fraction of bars removed, in runs of 1 to 60 bars. Default is 0.0.
+        raw (bool): if true, return the format of TvDatafeed.get_hist (naive "datetime" index, duplicated bars
+                        in download order). Otherwise, a normalized frame (UTC "Date" index, sorted, unique).
+                        Default is false.
+
+    Return:
+        pd.DataFrame: symbol, open, high, low, close, volume columns
+    """
+    rng = np.random.default_rng(seed)
+    n_total = n_rows + _n_gap_bars(n_rows, gaps)
+
+    # volatility clustering: a slowly varying multiplier of the volatility (moving sum of 500 normal variables)
+    noise = np.cumsum(rng.standard_normal(n_total + 500))
+    regime = np.exp(0.5 * (noise[500:] - noise[:-500]) / np.sqrt(500))
+    log_returns = volatility * regime * rng.standard_normal(n_total)
+    close = price * np.exp(np.cumsum(log_returns))
+    open_ = np.empty_like(close)
+    open_[0] = price
+    open_[1:] = close[:-1]
+    wick = volatility * regime * np.abs(rng.standard_normal((2, n_total)))
+    high = np.maximum(open_, close) * (1.0 + wick[0])
+    low = np.minimum(open_, close) * (1.0 - wick[1])
+
+    index = pd.date_range(start, periods=n_total, freq=freq, tz="UTC", name="Date")
+    minute_of_day = (index.hour * 60 + index.minute).to_numpy()
+    intraday = 1.0 + 0.5 * np.cos(2 * np.pi * minute_of_day / 1440.0) ** 2
+    volume = np.round(rng.lognormal(3.0, 0.6, n_total) * intraday * (1.0 + np.abs(log_returns) / volatility), 2)
+
+    df = pd.DataFrame(
+        {"symbol": symbol, "open": open_, "high": high, "low": low, "close": close, "volume": volume},
+        index=index,
+    )
+    if n_total > n_rows:
+        df = df.iloc[_kept_bars(rng, n_total, n_rows)]
+    if raw:
+        if duplicates > 0.0 and len(df):
+            repeated = rng.choice(len(df), size=int(len(df) * duplicates), replace=False)
+            df = pd.concat([df, df.iloc[np.sort(repeated)]])
+        df = df.tz_convert(None).rename_axis("datetime")
+    return df
+
+
+def _n_gap_bars(n_rows: int, gaps: float) -> int:
+    """
+    Get the number of bars removed by gaps.
+    """
+    return int(round(n_rows * gaps / (1.0 - gaps))) if 0.0 < gaps < 1.0 else 0
+
+
+def _kept_bars(rng: np.random.Generator, n_total: int, n_rows: int) -> np.ndarray:
+    """
+    Get positions of bars kept after removing n_total - n_rows bars in runs (gaps).
+    """
+    keep = np.ones(n_total, dtype=bool)
+    n_removed = n_total - n_rows
+    while n_removed > 0:
+        length = min(int(rng.integers(1, 61)), n_removed)
+        first = int(rng.integers(1, n_total - length + 1))
+        n_removed -= int(keep[first:first + length].sum())
+        keep[first:first + length] = False
+    # overlapping runs remove fewer bars than their length, which is counted above
+    return np.flatnonzero(keep)